@@ -3,6 +3,12 @@ ASGI config for RestaurantProject project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve the project through this module to push live order updates: the
+server-sent event stream (menu.views.order_events) holds one connection per
+customer, which an ASGI worker multiplexes cheaply. Under WSGI (gunicorn's
+default sync workers) the endpoint answers short polls instead and
+my_orders falls back to polling it.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
 """
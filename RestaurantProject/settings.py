@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 from django.contrib.messages import constants as messages
 
@@ -49,6 +50,9 @@ MESSAGE_TAGS = {
 }
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',
+    # Query count/time per request; see menu/instrumentation.py.
+    'menu.instrumentation.QueryInstrumentationMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -71,6 +75,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'menu.context_processors.unread_badges',
             ],
         },
     },
@@ -82,13 +87,69 @@ WSGI_APPLICATION = 'RestaurantProject.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
+# SQLite tuned for one node running several gunicorn workers:
+# - WAL lets readers run alongside the single writer.
+# - IMMEDIATE transactions take the write lock at BEGIN. A deferred
+#   transaction that reads and then writes fails with "database is
+#   locked" instead of waiting.
+# - Writers queue for up to `timeout` seconds.
+# Compare with `manage.py benchmark_sqlite_writes`.
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 60,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+            'init_command': (
+                'PRAGMA journal_mode=WAL;'
+                # Durable at checkpoints; a power cut can lose only the
+                # last few commits, never corrupt the file.
+                'PRAGMA synchronous=NORMAL;'
+                'PRAGMA cache_size=-20000;'  # 20 MB per connection
+                'PRAGMA mmap_size=134217728;'  # 128 MB
+                'PRAGMA temp_store=MEMORY;'
+            ),
+        },
+    }
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+# File based so every gunicorn worker on the node sees the same entries.
+# Nothing that must stay consistent lives here (the menu version is a
+# database row): add()/incr() are not atomic and entries past MAX_ENTRIES
+# are culled at random. Size MAX_ENTRIES for one fragment per food card,
+# a few badge/event keys per active customer, slot lists per table and day
+# and the catalog pages, so culling stays rare; each set() lists the
+# directory to check the limit.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / '.django_cache',
+        'OPTIONS': {
+            'MAX_ENTRIES': 20000,
+            'CULL_FREQUENCY': 4,
+        },
     }
 }
 
+# Seconds before a cached menu catalog is rebuilt (see menu/catalog.py)
+MENU_CATALOG_TIMEOUT = 60 * 15
+
+# Order numbers (see menu/order_numbers.py)
+# Give every node that serves checkouts its own id between 0 and 63 through
+# the ORDER_NUMBER_NODE_ID environment variable. Containers often run their
+# workers under the same PIDs on every node, so two nodes sharing an id can
+# issue the same number. Unset, DEBUG uses 0 and anything else fails the
+# system checks and refuses to number orders.
+ORDER_NUMBER_NODE_ID = os.environ.get('ORDER_NUMBER_NODE_ID', 0 if DEBUG else None)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -126,11 +187,55 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
+# `python manage.py collectstatic` builds content-hashed, gzip/brotli
+# compressed copies here. WhiteNoise serves the hashed names with a
+# far-future, immutable Cache-Control header.
+STATIC_ROOT = BASE_DIR / 'staticfiles'
 
 # Media files (User uploads)
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Uploads are stored once per distinct content and named by its hash
+# (see menu/storage.py).
+STORAGES = {
+    'default': {
+        'BACKEND': 'menu.storage.ContentAddressedStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+
+# In production let the web server (nginx `location /media/ { alias ...; }`)
+# or a CDN in front of MEDIA_ROOT serve uploads; the hashed names can be
+# cached with `Cache-Control: immutable`. WhiteNoise only serves files that
+# exist at startup, so it does not cover uploads. DEBUG always serves media;
+# DJANGO_SERVE_MEDIA=1 also makes Django serve it (through
+# django.views.static.serve, slow and unhardened) on a small single-node
+# deployment with no other option.
+SERVE_MEDIA = os.environ.get('DJANGO_SERVE_MEDIA') == '1'
+
+# Per-request SQL stats from menu/instrumentation.py, one JSON object per
+# line. WARNING logs only requests over their query budget; set the level
+# to INFO to log every request.
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'menu.sql': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
 LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/'
 LOGOUT_REDIRECT_URL = '/'
@@ -1,4 +1,7 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from . import search
+from .images import generate_variants
+from .order_flow import TRANSITIONS, bulk_transition
 from .models import (
     Category,
     FoodItem,
@@ -9,9 +12,12 @@ from .models import (
     CartItem,
     Order,
     OrderItem,
+    OrderStatusCounter,
     Notification,
 )
 
+ADMIN_SEARCH_LIMIT = 500
+
 # =========================
 # CATEGORY
 # =========================
@@ -39,6 +45,25 @@ class FoodItemAdmin(admin.ModelAdmin):
     list_editable = ("price", "available")
     ordering = ("name",)
 
+    def get_search_results(self, request, queryset, search_term):
+        # Use the full-text index instead of icontains scans.
+        if not search_term.strip():
+            return queryset, False
+        ids = search.search_food_ids(search_term, limit=ADMIN_SEARCH_LIMIT)
+        if len(ids) == ADMIN_SEARCH_LIMIT:
+            self.message_user(
+                request,
+                f"Showing the best {ADMIN_SEARCH_LIMIT} matches only; "
+                "narrow the search to see the rest.",
+                messages.WARNING,
+            )
+        return queryset.filter(pk__in=ids), False
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if "image" in form.changed_data and obj.image:
+            generate_variants(obj.image)
+
 
 # =========================
 # TABLE (ADMIN CONTROLLED)
@@ -74,6 +99,11 @@ class TableAdmin(admin.ModelAdmin):
         }),
     )
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if "image" in form.changed_data and obj.image:
+            generate_variants(obj.image)
+
 
 # =========================
 # TABLE BOOKING (AUTO CONFIRM)
@@ -162,6 +192,12 @@ class OrderAdmin(admin.ModelAdmin):
         "user__username",
     )
     ordering = ("-created_at",)
+    actions = (
+        "confirm_orders",
+        "mark_orders_ready",
+        "complete_orders",
+        "cancel_orders",
+    )
 
     readonly_fields = (
         "order_number",
@@ -207,6 +243,47 @@ class OrderAdmin(admin.ModelAdmin):
     )
 
 
+    def _bulk_transition(self, request, queryset, action):
+        moved = bulk_transition(action, list(queryset.values_list("id", flat=True)))
+        self.message_user(
+            request,
+            f"{len(moved)} order(s) moved to {TRANSITIONS[action]['to']}.",
+            messages.SUCCESS,
+        )
+
+    @admin.action(description="✅ Confirm selected orders")
+    def confirm_orders(self, request, queryset):
+        self._bulk_transition(request, queryset, "confirm")
+
+    @admin.action(description="🍕 Mark selected orders ready")
+    def mark_orders_ready(self, request, queryset):
+        self._bulk_transition(request, queryset, "ready")
+
+    @admin.action(description="✨ Mark selected orders completed")
+    def complete_orders(self, request, queryset):
+        self._bulk_transition(request, queryset, "complete")
+
+    @admin.action(description="❌ Cancel selected orders")
+    def cancel_orders(self, request, queryset):
+        self._bulk_transition(request, queryset, "cancel")
+
+
+# =========================
+# ORDER STATUS COUNTERS
+# =========================
+@admin.register(OrderStatusCounter)
+class OrderStatusCounterAdmin(admin.ModelAdmin):
+    # Maintained by Order.save(); repair with `manage.py rebuild_order_counters`.
+    list_display = ("status", "count")
+    readonly_fields = ("status", "count")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
 # =========================
 # ORDER ITEM
 # =========================
@@ -1,5 +1,11 @@
 from django.apps import AppConfig
+from django.core import checks
 
 
 class MenuConfig(AppConfig):
     name = 'menu'
+
+    def ready(self):
+        from . import order_numbers, signals  # noqa: F401
+
+        checks.register(order_numbers.check_node_id)
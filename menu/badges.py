@@ -0,0 +1,37 @@
+"""
+Per-user unread counters for the navbar badges.
+
+Counts of unread notifications and of orders the customer has not looked at
+since their last status change are kept in the shared cache. A warm entry
+costs no queries; anything that changes either count drops the user's entry
+and the next page view recounts it once.
+"""
+from django.core.cache import cache
+
+from .models import Notification, Order
+
+BADGE_TIMEOUT = 60 * 60
+
+
+def _key(user_id):
+    return f"menu:unread:{user_id}"
+
+
+def get_unread_counts(user_id):
+    key = _key(user_id)
+    counts = cache.get(key)
+    if counts is None:
+        counts = {
+            "notifications": Notification.objects.filter(
+                user_id=user_id, is_read=False
+            ).count(),
+            "orders": Order.objects.filter(
+                user_id=user_id, seen_by_user=False
+            ).count(),
+        }
+        cache.set(key, counts, BADGE_TIMEOUT)
+    return counts
+
+
+def invalidate(*user_ids):
+    cache.delete_many([_key(user_id) for user_id in set(user_ids)])
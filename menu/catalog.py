@@ -0,0 +1,106 @@
+"""
+Versioned cache for the customer facing menu catalog.
+
+`home` and `order_food` read the same available food items and categories on
+every hit, while the menu itself only changes a few times a day. The catalog
+is cached under a key that embeds a version number; every FoodItem/Category
+save or delete bumps the version (see menu/signals.py), so a changed menu is
+never served from an old entry and the old entries simply age out.
+
+The version is a database row (MenuVersion) bumped with an F() update in the
+same transaction as the menu change, not a cache key: the file cache culls
+entries at random and its add()/incr() are check-then-set, so a cached
+counter could be evicted or lose concurrent bumps. Reading it costs one
+primary-key query per request.
+
+Each entry carries a soft expiry. When it passes, a worker takes a short
+lock and rebuilds while the others keep serving the previous copy, so an
+expiring key does not send every worker to the database at once. The lock
+is only an optimisation: on the file cache two workers can occasionally
+both win it and rebuild the same version.
+
+Pages of the `order_food` card grid are cached under the same version with
+`get_page`.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Category, FoodItem, MenuVersion
+
+CATALOG_TIMEOUT = getattr(settings, "MENU_CATALOG_TIMEOUT", 60 * 15)
+LOCK_TIMEOUT = 10
+LOCK_WAIT = 2.0
+
+
+def get_version():
+    return MenuVersion.objects.current()
+
+
+def bump_version():
+    MenuVersion.objects.bump()
+
+
+def _load_catalog():
+    return {
+        "foods": list(
+            FoodItem.objects.filter(available=True).select_related("category")
+        ),
+        "categories": list(Category.objects.all()),
+    }
+
+
+def _rebuild(key, lock_key):
+    try:
+        catalog = _load_catalog()
+        cache.set(
+            key,
+            (time.time() + CATALOG_TIMEOUT, catalog),
+            timeout=CATALOG_TIMEOUT * 2,
+        )
+        return catalog
+    finally:
+        cache.delete(lock_key)
+
+
+def get_catalog(version=None):
+    """
+    Return ``{"foods": [...], "categories": [...]}`` for the current menu, or
+    for ``version`` when the caller has already read it.
+    """
+    key = f"menu:catalog:{version or get_version()}"
+    lock_key = f"{key}:lock"
+
+    entry = cache.get(key)
+    if entry is not None:
+        fresh_until, catalog = entry
+        if fresh_until > time.time() or not cache.add(lock_key, 1, LOCK_TIMEOUT):
+            return catalog
+        return _rebuild(key, lock_key)
+
+    if cache.add(lock_key, 1, LOCK_TIMEOUT):
+        return _rebuild(key, lock_key)
+
+    # Another worker is building this version: wait for it instead of
+    # piling onto the database, but never longer than LOCK_WAIT.
+    deadline = time.monotonic() + LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[1]
+    return _load_catalog()
+
+
+def get_page(name, build, version=None):
+    """
+    Return ``build()`` cached as page ``name`` of the current catalog
+    version (or ``version``). A menu change moves every page to a new key.
+    """
+    key = f"menu:page:{version or get_version()}:{name}"
+    page = cache.get(key)
+    if page is None:
+        page = build()
+        cache.set(key, page, CATALOG_TIMEOUT)
+    return page
@@ -0,0 +1,8 @@
+from .badges import get_unread_counts
+
+
+def unread_badges(request):
+    user = getattr(request, "user", None)
+    if not user or not user.is_authenticated or user.is_staff:
+        return {}
+    return {"unread_counts": get_unread_counts(user.id)}
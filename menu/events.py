@@ -0,0 +1,100 @@
+"""
+Live order status for customers over server-sent events.
+
+Publishing is a per-user version number in the shared (file based) cache:
+every committed change to one of a user's orders bumps it. An open stream
+only reads that key once a second and touches the database only when the
+version moves, so a connected customer costs no queries while nothing
+happens. No broker is needed, and publishers can be any process on the node
+(web workers, the admin, management commands).
+
+The stream is only served through the ASGI application
+(RestaurantProject/asgi.py). Under WSGI Django buffers a streaming response
+until it ends, so a stream would pin a worker for MAX_STREAM_SECONDS and
+deliver nothing live. There the same endpoint answers short polls instead
+(``order_changes``), which cost no queries while the version is unchanged.
+"""
+import asyncio
+import json
+import time
+
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
+from django.utils import timezone
+
+from .models import Order
+
+POLL_INTERVAL = 1.0
+HEARTBEAT_INTERVAL = 15.0
+# Streams are recycled; EventSource reconnects on its own.
+MAX_STREAM_SECONDS = 10 * 60
+RETRY_MS = 3000
+# How often my_orders polls when it cannot stream.
+POLL_FALLBACK_MS = 15000
+
+
+def is_streaming(request):
+    """Whether ``request`` came in through the ASGI handler."""
+    return isinstance(request, ASGIRequest)
+
+
+def _version_key(user_id):
+    return f"menu:order-events:{user_id}"
+
+
+def publish_order_change(user_id):
+    key = _version_key(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _changed_orders(user_id, since):
+    rows = (
+        Order.objects.filter(user_id=user_id, updated_at__gt=since)
+        .order_by("updated_at")
+        .values("id", "order_number", "order_status", "estimated_time", "updated_at")
+    )
+    return [row async for row in rows]
+
+
+async def order_changes(user_id, since, version):
+    """
+    Short-poll answer for clients that cannot stream: the orders changed
+    after ``since``, unless the user's version still equals ``version``.
+    """
+    current = await cache.aget(_version_key(user_id))
+    rows = []
+    if version != str(current):
+        rows = await _changed_orders(user_id, since)
+        for row in rows:
+            since = max(since, row.pop("updated_at"))
+    return {"version": str(current), "since": since.isoformat(), "orders": rows}
+
+
+async def order_event_stream(user_id):
+    """Yield SSE frames for ``user_id``'s orders as their status changes."""
+    since = timezone.now()
+    version = await cache.aget(_version_key(user_id))
+    started = last_write = time.monotonic()
+
+    yield f"retry: {RETRY_MS}\n\n"
+
+    while time.monotonic() - started < MAX_STREAM_SECONDS:
+        await asyncio.sleep(POLL_INTERVAL)
+
+        current = await cache.aget(_version_key(user_id))
+        if current != version:
+            version = current
+            for row in await _changed_orders(user_id, since):
+                since = max(since, row.pop("updated_at"))
+                yield _sse("order", row)
+            last_write = time.monotonic()
+        elif time.monotonic() - last_write >= HEARTBEAT_INTERVAL:
+            yield ": keep-alive\n\n"
+            last_write = time.monotonic()
@@ -1,4 +1,5 @@
 from django import forms
+from .images import generate_variants
 from .models import FoodItem, Category
 
 class FoodItemForm(forms.ModelForm):
@@ -35,3 +36,9 @@ class FoodItemForm(forms.ModelForm):
                 'class': 'form-check-input'
             })
         }
+
+    def save(self, commit=True):
+        food = super().save(commit)
+        if commit and "image" in self.changed_data and food.image:
+            generate_variants(food.image)
+        return food
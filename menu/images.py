@@ -0,0 +1,92 @@
+"""
+Resized variants of uploaded food and table photos.
+
+Admins upload photos at camera size, but the menu shows them as small cards.
+Every upload gets WebP and JPEG copies at a few fixed widths, plus a tiny
+blurred placeholder that is painted while the real image lazy-loads. The
+``responsive_image`` template tag (menu/templatetags/menu_images.py) serves
+them through ``<picture>``/``srcset`` so each device fetches the smallest
+copy that fills the slot.
+
+Variants sit next to the original, e.g. ``food_images/variants/biriyani-card.webp``.
+"""
+import posixpath
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageFilter, ImageOps
+
+# name -> target width in pixels
+VARIANTS = {
+    "thumb": 160,
+    "card": 480,
+    "detail": 1024,
+}
+FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpg": ("JPEG", {"quality": 80, "optimize": True, "progressive": True}),
+}
+PLACEHOLDER_WIDTH = 24
+
+
+def variant_name(name, variant, ext):
+    directory, filename = posixpath.split(name)
+    stem = posixpath.splitext(filename)[0]
+    return posixpath.join(directory, "variants", f"{stem}-{variant}.{ext}")
+
+
+def _resized(image, width):
+    if image.width <= width:
+        return image.copy()
+    height = round(image.height * width / image.width)
+    return image.resize((width, height), Image.LANCZOS)
+
+
+def _encode(image, ext):
+    fmt, options = FORMATS[ext]
+    buffer = BytesIO()
+    image.save(buffer, fmt, **options)
+    return ContentFile(buffer.getvalue())
+
+
+def _store(storage, name, content):
+    # Variant names are derived from the original, so replace in place.
+    if storage.exists(name):
+        storage.delete(name)
+    getattr(storage, "save_exact", storage.save)(name, content)
+
+
+def generate_variants(field_file):
+    """Write every variant for an ImageField's current file."""
+    if not field_file:
+        return
+
+    storage = field_file.storage
+    with storage.open(field_file.name, "rb") as source:
+        image = ImageOps.exif_transpose(Image.open(source))
+        if image.mode not in ("RGB", "L"):
+            # JPEG has no alpha channel: flatten onto white.
+            background = Image.new("RGB", image.size, "white")
+            background.paste(image.convert("RGBA"), mask=image.convert("RGBA"))
+            image = background
+        image = image.convert("RGB")
+
+    for variant, width in VARIANTS.items():
+        resized = _resized(image, width)
+        for ext in FORMATS:
+            _store(storage, variant_name(field_file.name, variant, ext), _encode(resized, ext))
+
+    placeholder = _resized(image, PLACEHOLDER_WIDTH).filter(ImageFilter.GaussianBlur(1))
+    _store(storage, variant_name(field_file.name, "placeholder", "jpg"), _encode(placeholder, "jpg"))
+
+
+def has_variants(field_file):
+    return field_file.storage.exists(variant_name(field_file.name, "card", "jpg"))
+
+
+def delete_variants(storage, name):
+    for variant in (*VARIANTS, "placeholder"):
+        for ext in FORMATS:
+            variant_file = variant_name(name, variant, ext)
+            if storage.exists(variant_file):
+                storage.delete(variant_file)
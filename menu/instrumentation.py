@@ -0,0 +1,153 @@
+"""
+Per-request SQL instrumentation.
+
+``QueryInstrumentationMiddleware`` records how many queries each request
+ran, how long they took in total and which statements repeated (the
+signature of an N+1). Every request is logged as one JSON line on the
+``menu.sql`` logger. Staff also get the numbers in an ``X-SQL-Stats``
+response header. A request that exceeds its URL name's budget in
+``menu.urls.QUERY_BUDGETS`` is logged as a warning.
+
+``record_queries`` is the same recorder as a context manager for tests.
+
+Recorders are found through a context variable rather than installed on
+one connection. Under ASGI, sync views and async ORM calls run on worker
+threads with their own connections, and the context variable follows the
+request there. Every connection gets the dispatching wrapper when it
+opens (see menu/signals.py). Queries a streaming response runs after the
+view returns are not counted.
+"""
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from .urls import QUERY_BUDGETS
+
+logger = logging.getLogger("menu.sql")
+
+_IN_LIST = re.compile(r"\bIN \((?:%s, )*%s\)")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+_SPACE = re.compile(r"\s+")
+
+
+def fingerprint(sql):
+    """Normalise ``sql`` so repeats of one statement compare equal."""
+    sql = _IN_LIST.sub("IN (...)", sql)
+    sql = _LITERAL.sub("?", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        # Installed with connection.execute_wrapper().
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+    @property
+    def duplicates(self):
+        return {sql: n for sql, n in self.fingerprints.items() if n > 1}
+
+    def as_dict(self):
+        return {
+            "queries": self.count,
+            "db_ms": round(self.seconds * 1000, 2),
+            "duplicates": self.duplicates,
+        }
+
+
+# QueryStats recording the current request (or test block), innermost last.
+_recorders = ContextVar("menu_sql_recorders", default=())
+
+
+def _dispatch(execute, sql, params, many, context):
+    for stats in _recorders.get():
+        execute = partial(stats, execute)
+    return execute(sql, params, many, context)
+
+
+def install(connection):
+    """Route ``connection``'s queries to the active recorders."""
+    if _dispatch not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_dispatch)
+
+
+@contextmanager
+def record_queries(using=DEFAULT_DB_ALIAS):
+    """Yield a QueryStats that counts the queries run inside the block."""
+    install(connections[using])
+    stats = QueryStats()
+    token = _recorders.set(_recorders.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _recorders.reset(token)
+
+
+class QueryInstrumentationMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        with record_queries() as stats:
+            response = self.get_response(request)
+        return self.finish(request, response, stats, getattr(request, "user", None))
+
+    async def __acall__(self, request):
+        with record_queries() as stats:
+            response = await self.get_response(request)
+        user = await request.auser() if hasattr(request, "auser") else None
+        return self.finish(request, response, stats, user)
+
+    def finish(self, request, response, stats, user):
+        match = request.resolver_match
+        url_name = match.url_name if match else None
+        method = "GET" if request.method == "HEAD" else request.method
+        budget = QUERY_BUDGETS.get((url_name, method))
+        over_budget = budget is not None and stats.count > budget
+
+        record = {
+            "url_name": url_name,
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "budget": budget,
+            **stats.as_dict(),
+        }
+        logger.log(
+            logging.WARNING if over_budget else logging.INFO,
+            json.dumps(record),
+        )
+
+        if user is not None and user.is_staff:
+            response["X-SQL-Stats"] = (
+                f"queries={stats.count}; db_ms={record['db_ms']}; "
+                f"duplicates={sum(stats.duplicates.values())}; budget={budget}"
+            )
+        return response
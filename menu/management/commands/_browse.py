@@ -0,0 +1,19 @@
+"""Helpers for commands that drive views through the test client."""
+from django.conf import settings
+from django.test import Client
+
+
+def site_host():
+    # Any concrete name the site answers to; DEBUG also accepts localhost.
+    for host in settings.ALLOWED_HOSTS:
+        if "*" not in host and not host.startswith("."):
+            return host
+    return "localhost"
+
+
+def client_for(user, **kwargs):
+    """A Client logged in as ``user`` (anonymous if None)."""
+    client = Client(HTTP_HOST=site_host(), **kwargs)
+    if user is not None:
+        client.force_login(user)
+    return client
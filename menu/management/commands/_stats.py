@@ -0,0 +1,10 @@
+"""Summary statistics shared by the benchmark and stress commands."""
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of ``samples`` (any order); 0.0 when empty."""
+    samples = sorted(samples)
+    if not samples:
+        return 0.0
+    # Integer ceil, so 99% of 100 samples is rank 99 rather than 100.
+    return samples[max(0, -(-len(samples) * pct // 100) - 1)]
@@ -0,0 +1,137 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from menu.models import Table
+
+from ._browse import client_for
+
+# (url name, args, who requests it, tables it may scan). Args that are
+# callables are resolved against the database so the audit runs on real rows.
+PAGES = [
+    # Builds the cached menu catalog, which is the whole menu by design.
+    ("home", (), "customer", {"menu_fooditem"}),
+    # "All" walks foods in id order and stops after one page.
+    ("order_food", (), "customer", {"menu_fooditem"}),
+    ("view_cart", (), "customer", set()),
+    ("my_orders", (), "customer", set()),
+    ("my_bookings", (), "customer", set()),
+    ("notifications", (), "customer", set()),
+    ("book_table", (), "customer", set()),
+    ("table_detail", (lambda: Table.objects.values_list("id", flat=True).first(),), "customer", set()),
+    ("admin_orders", (), "staff", set()),
+    # Lists every food item.
+    ("admin_food_list", (), "staff", {"menu_fooditem"}),
+    ("admin_tables", (), "staff", set()),
+]
+
+# Lookup tables that stay a handful of rows; scanning them is fine.
+SMALL_TABLES = {
+    "django_content_type",
+    "menu_category",
+    "menu_orderstatuscounter",
+    "menu_table",
+}
+
+
+def _full_scans(sql, params):
+    """Return the tables ``sql`` reads without an index."""
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+            details = [row[-1] for row in cursor.fetchall()]
+            # Co-routines and materialised subqueries (e.g. the window a
+            # sliced Prefetch filters on) hold rows this plan already
+            # fetched through an index; scanning them is not a table scan.
+            derived = {
+                detail.split(" ", 1)[1]
+                for detail in details
+                if detail.startswith(("CO-ROUTINE ", "MATERIALIZE "))
+            }
+            scans = set()
+            for detail in details:
+                # "SCAN menu_order" is a table scan; "SCAN ... USING INDEX"
+                # walks an index in order and is what keyset pages want.
+                if detail.startswith("SCAN ") and " USING " not in detail:
+                    table = detail.split()[1]
+                    if table not in derived and not table.startswith("(subquery-"):
+                        scans.add(table)
+            return scans
+        if connection.vendor == "mysql":
+            cursor.execute("EXPLAIN " + sql, params)
+            columns = [col[0] for col in cursor.description]
+            return {
+                row["table"] for row in (dict(zip(columns, r)) for r in cursor.fetchall())
+                # <derived2>, <subquery3>: this query's own intermediate rows.
+                if row["type"] == "ALL" and not row["table"].startswith("<")
+            }
+    raise CommandError(f"No EXPLAIN support for {connection.vendor}")
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN every query the main views run and flag full table scans."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--customer", help="Username to browse customer pages as.")
+        parser.add_argument("--staff", help="Username to browse admin pages as.")
+        parser.add_argument(
+            "--allow",
+            action="append",
+            default=[],
+            metavar="TABLE",
+            help="Also accept full scans of TABLE (repeatable).",
+        )
+
+    def _user(self, username, staff):
+        users = User.objects.filter(is_active=True, is_staff=staff)
+        if username:
+            users = users.filter(username=username)
+        return users.order_by("id").first()
+
+    def handle(self, *args, **options):
+        allowed = SMALL_TABLES | set(options["allow"])
+        users = {
+            "customer": self._user(options["customer"], staff=False),
+            "staff": self._user(options["staff"], staff=True),
+        }
+        flagged = 0
+
+        # Views may write (e.g. my_orders marks orders seen): undo it all.
+        with transaction.atomic():
+            for name, args, role, expected in PAGES:
+                user = users[role]
+                args = [arg() if callable(arg) else arg for arg in args]
+                if user is None or None in args:
+                    self.stdout.write(f"{name}: skipped (no {role} user or rows)")
+                    continue
+
+                client = client_for(user)
+                with CaptureQueriesContext(connection) as captured:
+                    response = client.get(reverse(name, args=args))
+                if response.status_code != 200:
+                    self.stdout.write(f"{name}: skipped (HTTP {response.status_code})")
+                    continue
+
+                problems = []
+                for query in captured.captured_queries:
+                    sql = query["sql"]
+                    if not sql.lstrip().upper().startswith("SELECT"):
+                        continue
+                    # Captured SQL has its parameters inlined already.
+                    scans = _full_scans(sql.replace("%", "%%"), ()) - allowed - expected
+                    if scans:
+                        problems.append((", ".join(sorted(scans)), sql))
+
+                self.stdout.write(f"{name}: {len(captured)} queries, {len(problems)} full scan(s)")
+                for tables, sql in problems:
+                    self.stdout.write(self.style.WARNING(f"  SCAN {tables}: {sql[:200]}"))
+                flagged += len(problems)
+
+            transaction.set_rollback(True)
+
+        if flagged:
+            self.stderr.write(self.style.ERROR(f"{flagged} quer(ies) scan whole tables."))
+            raise SystemExit(1)
+        self.stdout.write(self.style.SUCCESS("No unindexed full scans."))
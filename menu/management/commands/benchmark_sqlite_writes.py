@@ -0,0 +1,122 @@
+import multiprocessing
+import os
+import tempfile
+import time
+from collections import Counter
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, close_old_connections, connections
+from django.test.utils import override_settings
+
+from menu import orders
+from menu.models import Cart, CartItem, Category, FoodItem, Order
+
+from ._stats import percentile
+
+# SQLite as it behaves without any OPTIONS: rollback journal, deferred
+# transactions, a 5 second busy timeout and a connection per request.
+PLAIN = {"CONN_MAX_AGE": 0, "OPTIONS": {}}
+LOCMEM = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+def _use_database(overrides):
+    """Point the default alias at a different SQLite file/configuration."""
+    connections.close_all()
+    connections.settings["default"].update(overrides)
+    try:
+        del connections["default"]
+    except AttributeError:
+        pass  # never connected in this thread
+
+
+def _checkout_loop(args):
+    """One worker process: add to cart and check out until time is up."""
+    worker, seconds = args
+    user = User.objects.get(username=f"bench_writer_{worker}")
+    food = FoodItem.objects.first()
+    latencies, errors = [], Counter()
+
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        try:
+            cart, _ = Cart.objects.get_or_create(user=user)
+            CartItem.objects.update_or_create(cart=cart, food=food, defaults={"quantity": 2})
+            orders.place_order(user, "UPI")
+            # The read my_orders does after a checkout.
+            list(Order.objects.filter(user=user)[:10])
+        except OperationalError as exc:
+            errors[str(exc)] += 1
+        else:
+            latencies.append((time.perf_counter() - started) * 1000)
+        finally:
+            # What the end of a request does: close unless CONN_MAX_AGE
+            # keeps the connection.
+            close_old_connections()
+    connections.close_all()
+    return latencies, errors
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure concurrent checkout throughput on a scratch SQLite database, "
+        "with plain SQLite defaults and with the DATABASES['default'] settings."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=8, help="Processes, like gunicorn workers.")
+        parser.add_argument("--seconds", type=float, default=10.0, help="Run time per configuration.")
+
+    def handle(self, *args, **options):
+        configured = connections.settings["default"]
+        if configured["ENGINE"] != "django.db.backends.sqlite3":
+            raise CommandError("The default database is not SQLite.")
+
+        original = {key: configured[key] for key in ("NAME", "CONN_MAX_AGE", "OPTIONS")}
+        modes = [
+            ("plain", PLAIN),
+            ("configured", {"CONN_MAX_AGE": original["CONN_MAX_AGE"], "OPTIONS": original["OPTIONS"]}),
+        ]
+        results = []
+        try:
+            with tempfile.TemporaryDirectory() as tmp, override_settings(CACHES=LOCMEM):
+                for label, overrides in modes:
+                    _use_database({**overrides, "NAME": os.path.join(tmp, f"{label}.sqlite3")})
+                    self.prepare(options["workers"])
+                    results.append((label, self.run(options["workers"], options["seconds"])))
+        finally:
+            _use_database(original)
+
+        self.stdout.write(f"{options['workers']} workers x {options['seconds']:g}s of checkouts")
+        for label, (latencies, errors, elapsed) in results:
+            self.stdout.write(
+                f"{label:11} {len(latencies):6} commits  {len(latencies) / elapsed:8.1f}/s  "
+                f"p50 {percentile(latencies, 50):7.1f} ms  p99 {percentile(latencies, 99):7.1f} ms  "
+                f"errors {sum(errors.values())}"
+            )
+            for message, count in errors.most_common():
+                self.stdout.write(self.style.WARNING(f"            {count} x {message}"))
+
+    def prepare(self, workers):
+        call_command("migrate", verbosity=0)
+        category = Category.objects.create(name="Bench")
+        FoodItem.objects.create(category=category, name="Bench dish", price=100, description="Bench")
+        User.objects.bulk_create(User(username=f"bench_writer_{i}") for i in range(workers))
+        connections.close_all()
+
+    def run(self, workers, seconds):
+        # Forked workers inherit the settings above and open their own
+        # connections.
+        context = multiprocessing.get_context("fork")
+        started = time.perf_counter()
+        with context.Pool(workers) as pool:
+            outcomes = pool.map(_checkout_loop, [(i, seconds) for i in range(workers)])
+        elapsed = time.perf_counter() - started
+
+        latencies, errors = [], Counter()
+        for worker_latencies, worker_errors in outcomes:
+            latencies += worker_latencies
+            errors += worker_errors
+        return latencies, errors, elapsed
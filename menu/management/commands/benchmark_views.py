@@ -0,0 +1,155 @@
+import json
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.urls import reverse
+from django.utils import timezone
+
+from menu.instrumentation import record_queries
+from menu.models import FoodItem, Notification, Order, OrderItem, TableBooking
+
+from ._browse import client_for
+from ._stats import percentile
+
+# (url name, method, data, who requests it). Every request is rolled back,
+# so process_payment checks out the same cart on each iteration.
+HOT_VIEWS = [
+    ("order_food", "get", None, "customer"),
+    ("view_cart", "get", None, "customer"),
+    ("process_payment", "post", {"payment_method": "UPI"}, "customer"),
+    ("admin_orders", "get", None, "staff"),
+    ("my_orders", "get", None, "customer"),
+    ("book_table", "get", None, "customer"),
+]
+
+# Row counts stored with each run, so results from different data sizes
+# are not compared by accident.
+COUNTED = [FoodItem, User, Order, OrderItem, TableBooking, Notification]
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the hot views against the current database (see seed_data) and "
+        "optionally fail when they regress against a saved baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=50)
+        parser.add_argument("--warmup", type=int, default=5, help="Untimed requests per view first.")
+        parser.add_argument("--customer", default="seed_customer")
+        parser.add_argument("--staff", default="seed_staff")
+        parser.add_argument("--cold", action="store_true", help="Clear the cache before every request.")
+        parser.add_argument("--view", action="append", metavar="NAME", help="Only run NAME (repeatable).")
+        parser.add_argument("--output", metavar="FILE", help="Write the results as JSON.")
+        parser.add_argument("--compare", metavar="FILE", help="Baseline JSON from an earlier --output.")
+        parser.add_argument(
+            "--threshold", type=float, default=20.0,
+            help="Percent p50 slowdown that counts as a regression (default 20).",
+        )
+
+    def _user(self, username):
+        try:
+            return User.objects.get(username=username)
+        except User.DoesNotExist:
+            raise CommandError(f"No user '{username}'; run seed_data or pass --customer/--staff.")
+
+    def handle(self, *args, **options):
+        clients = {
+            "customer": client_for(self._user(options["customer"])),
+            "staff": client_for(self._user(options["staff"])),
+        }
+        views = [v for v in HOT_VIEWS if not options["view"] or v[0] in options["view"]]
+        if not views:
+            raise CommandError("No matching views.")
+
+        results = {}
+        for name, method, data, who in views:
+            results[name] = self.run_view(
+                clients[who], name, method, data,
+                options["iterations"], options["warmup"], options["cold"],
+            )
+            row = results[name]
+            self.stdout.write(
+                f"{name:16} {row['status']}  p50 {row['p50_ms']:8.2f}  p90 {row['p90_ms']:8.2f}  "
+                f"p99 {row['p99_ms']:8.2f}  max {row['max_ms']:8.2f} ms  {row['queries']} queries"
+            )
+
+        report = {
+            "created_at": timezone.now().isoformat(),
+            "database": connection.vendor,
+            "iterations": options["iterations"],
+            "cold_cache": options["cold"],
+            "rows": {model._meta.label: model.objects.count() for model in COUNTED},
+            "views": results,
+        }
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(f"Wrote {options['output']}")
+
+        if options["compare"]:
+            with open(options["compare"]) as fh:
+                baseline = json.load(fh)
+            if self.compare(baseline, report, options["threshold"]):
+                raise SystemExit(1)
+
+    def run_view(self, client, name, method, data, iterations, warmup, cold):
+        url = reverse(name)
+        timings, queries, status = [], 0, None
+        for i in range(warmup + iterations):
+            if cold:
+                cache.clear()
+            # Writes are undone so every iteration sees the same data.
+            with transaction.atomic():
+                with record_queries() as stats:
+                    started = time.perf_counter()
+                    response = getattr(client, method)(url, data)
+                    elapsed = time.perf_counter() - started
+                transaction.set_rollback(True)
+            if i >= warmup:
+                timings.append(elapsed * 1000)
+                queries, status = stats.count, response.status_code
+
+        timings.sort()
+        return {
+            "status": status,
+            "queries": queries,
+            "p50_ms": round(percentile(timings, 50), 3),
+            "p90_ms": round(percentile(timings, 90), 3),
+            "p99_ms": round(percentile(timings, 99), 3),
+            "mean_ms": round(statistics.fmean(timings), 3),
+            "max_ms": round(timings[-1], 3),
+        }
+
+    def compare(self, baseline, report, threshold):
+        """Print the change per view; return True if any view regressed."""
+        if baseline.get("rows") != report["rows"]:
+            self.stdout.write(self.style.WARNING("Row counts differ from the baseline; timings may not compare."))
+
+        regressed = False
+        for name, now in report["views"].items():
+            before = baseline["views"].get(name)
+            if before is None:
+                continue
+            change = (now["p50_ms"] - before["p50_ms"]) / before["p50_ms"] * 100 if before["p50_ms"] else 0.0
+            slower = change > threshold
+            more_queries = now["queries"] > before["queries"]
+            line = (
+                f"{name:16} p50 {before['p50_ms']:.2f} -> {now['p50_ms']:.2f} ms ({change:+.1f}%), "
+                f"queries {before['queries']} -> {now['queries']}"
+            )
+            if slower or more_queries:
+                regressed = True
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+
+        if regressed:
+            self.stderr.write(self.style.ERROR(f"Regression beyond {threshold:g}% or extra queries."))
+        else:
+            self.stdout.write(self.style.SUCCESS("No regressions."))
+        return regressed
@@ -0,0 +1,95 @@
+import os
+
+from django.core.files import File
+from django.core.management.base import BaseCommand
+
+from menu.images import delete_variants, generate_variants, has_variants
+from menu.models import FoodItem, Table
+from menu.storage import ContentAddressedStorage
+
+IMAGE_FIELDS = (
+    (FoodItem, "image", "food_images"),
+    (Table, "image", "table_images"),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Move existing uploads to content-addressed names, point the database "
+        "at them and remove the duplicate copies."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would change without touching files or rows.",
+        )
+        parser.add_argument(
+            "--delete-orphans",
+            action="store_true",
+            help="Also delete files in the upload folders that no row references.",
+        )
+
+    def handle(self, *args, **options):
+        storage = ContentAddressedStorage()
+        dry_run = options["dry_run"]
+        rewritten = removed = 0
+
+        for model, field, folder in IMAGE_FIELDS:
+            names = (
+                model.objects.exclude(**{field: ""})
+                .exclude(**{f"{field}__isnull": True})
+                .values_list(field, flat=True)
+                .distinct()
+            )
+            for name in list(names):
+                if not storage.exists(name):
+                    self.stderr.write(f"Missing file for {model.__name__}.{field}: {name}")
+                    continue
+
+                with storage.open(name, "rb") as handle:
+                    target = storage.hashed_name(name, File(handle))
+                    if target == name:
+                        continue
+                    self.stdout.write(f"{name} -> {target}")
+                    if dry_run:
+                        rewritten += model.objects.filter(**{field: name}).count()
+                        removed += 1
+                        continue
+                    if not storage.exists(target):
+                        storage.save_exact(target, File(handle))
+
+                rewritten += model.objects.filter(**{field: name}).update(**{field: target})
+                storage.delete(name)
+                delete_variants(storage, name)
+                removed += 1
+
+                obj = model.objects.filter(**{field: target}).first()
+                if obj and not has_variants(getattr(obj, field)):
+                    generate_variants(getattr(obj, field))
+
+            if options["delete_orphans"]:
+                removed += self._delete_orphans(storage, model, field, folder, dry_run)
+
+        verb = "Would rewrite" if dry_run else "Rewrote"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {rewritten} row(s); removed {removed} file(s)."
+        ))
+
+    def _delete_orphans(self, storage, model, field, folder, dry_run):
+        if not storage.exists(folder):
+            return 0
+        referenced = set(model.objects.values_list(field, flat=True))
+        _, files = storage.listdir(folder)
+
+        deleted = 0
+        for filename in files:
+            name = os.path.join(folder, filename).replace(os.sep, "/")
+            if name in referenced:
+                continue
+            self.stdout.write(f"orphan: {name}")
+            if not dry_run:
+                storage.delete(name)
+            deleted += 1
+        return deleted
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from menu.images import generate_variants, has_variants
+from menu.models import FoodItem, Table
+
+
+class Command(BaseCommand):
+    help = "Create resized WebP/JPEG variants for food and table photos."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Regenerate variants that already exist.",
+        )
+
+    def handle(self, *args, **options):
+        done = 0
+        for model in (FoodItem, Table):
+            for obj in model.objects.exclude(image="").exclude(image__isnull=True).only("id", "image"):
+                if not options["force"] and has_variants(obj.image):
+                    continue
+                try:
+                    generate_variants(obj.image)
+                except (OSError, ValueError) as exc:
+                    self.stderr.write(f"{model.__name__} {obj.pk}: {obj.image.name}: {exc}")
+                    continue
+                done += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Generated variants for {done} image(s)."))
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from menu import outbox
+
+
+class Command(BaseCommand):
+    help = "Deliver queued notifications from the outbox in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=outbox.DEFAULT_BATCH_SIZE,
+            help="Notifications written per transaction.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Seconds to sleep when the outbox is empty.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain what is queued now and exit instead of polling.",
+        )
+
+    def handle(self, *args, **options):
+        delivered = 0
+        try:
+            while True:
+                sent = outbox.drain(options["batch_size"])
+                delivered += sent
+                if sent:
+                    continue
+                if options["once"]:
+                    break
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(f"Delivered {delivered} notification(s)."))
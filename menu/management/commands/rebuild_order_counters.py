@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from menu.models import OrderStatusCounter
+
+
+class Command(BaseCommand):
+    help = "Recount orders per status and repair the admin dashboard counters."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report drifted counters; exit with status 1 if any.",
+        )
+
+    def handle(self, *args, **options):
+        drift = OrderStatusCounter.objects.rebuild(commit=not options["check"])
+
+        if not drift:
+            self.stdout.write(self.style.SUCCESS("Order counters are in sync."))
+            return
+
+        for status, (stored, actual) in sorted(drift.items()):
+            self.stdout.write(f"{status}: stored={stored} actual={actual}")
+
+        if options["check"]:
+            self.stderr.write(self.style.ERROR(f"{len(drift)} counter(s) out of sync."))
+            raise SystemExit(1)
+        self.stdout.write(self.style.SUCCESS(f"Repaired {len(drift)} counter(s)."))
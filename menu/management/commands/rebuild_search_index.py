@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from menu.models import FoodItem
+from menu.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text menu search index from FoodItem and Category."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            rebuild_index()
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {FoodItem.objects.count()} food item(s)."
+        ))
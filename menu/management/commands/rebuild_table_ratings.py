@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from menu.models import Table
+
+
+class Command(BaseCommand):
+    help = "Recount reviews per table and repair the stored rating sum and count."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report drifted tables; exit with status 1 if any.",
+        )
+
+    def handle(self, *args, **options):
+        drift = Table.objects.rebuild_ratings(commit=not options["check"])
+
+        if not drift:
+            self.stdout.write(self.style.SUCCESS("Table ratings are in sync."))
+            return
+
+        for number, (stored, actual) in sorted(drift.items()):
+            self.stdout.write(
+                f"Table {number}: stored sum/count={stored[0]}/{stored[1]} "
+                f"actual={actual[0]}/{actual[1]}"
+            )
+
+        if options["check"]:
+            self.stderr.write(self.style.ERROR(f"{len(drift)} table(s) out of sync."))
+            raise SystemExit(1)
+        self.stdout.write(self.style.SUCCESS(f"Repaired {len(drift)} table(s)."))
@@ -0,0 +1,287 @@
+import random
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from menu import catalog, search
+from menu.models import (
+    Cart, CartItem, Category, FoodItem, Notification,
+    Order, OrderItem, OrderStatusCounter, Table, TableBooking,
+)
+from menu.order_numbers import next_order_number
+from menu.slots import day_slots
+
+# Production-sized volumes; --scale shrinks them all at once.
+DEFAULT_VOLUMES = {
+    "foods": 500,
+    "users": 10_000,
+    "orders": 1_000_000,
+    "bookings": 200_000,
+    "notifications": 2_000_000,
+}
+CATEGORIES = [
+    "Starters", "Soups", "Salads", "Biriyani", "Curries", "Tandoor",
+    "Breads", "Rice", "Noodles", "Desserts", "Drinks", "Combos",
+]
+ADJECTIVES = ["Spicy", "Crispy", "Smoky", "Creamy", "Butter", "Garlic", "Masala", "Classic", "Kerala", "Hyderabadi"]
+DISHES = ["Paneer", "Chicken", "Mutton", "Prawn", "Veg", "Mushroom", "Fish", "Egg", "Gobi", "Dal"]
+WORDS = (
+    "slow cooked fresh herbs aromatic spices served with house chutney "
+    "tender marinated overnight charcoal grilled rich gravy golden fried "
+    "topped coriander onions tangy sweet mild hot signature recipe"
+).split()
+TABLES = 40
+CART_SHARE = 0.1
+ORDER_HISTORY_DAYS = 365
+# Orders newer than this are still moving through the kitchen.
+OPEN_ORDER_AGE = timedelta(hours=2)
+BENCH_CUSTOMER_ORDERS = 200
+BENCH_CART_ITEMS = 5
+
+
+@contextmanager
+def explicit_timestamps(*fields):
+    """Let bulk inserts spread auto_now/auto_now_add fields over time."""
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def _chunks(total, size):
+    start = 0
+    while start < total:
+        yield start, min(size, total - start)
+        start += size
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed realistic volumes of menu, users, orders, bookings and "
+        "notifications for benchmarking (see benchmark_views)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", type=float, default=1.0, help="Multiply every default volume.")
+        for name, default in DEFAULT_VOLUMES.items():
+            parser.add_argument(f"--{name}", type=int, help=f"Rows to create (default {default:,} x scale).")
+        parser.add_argument("--prefix", default="seed", help="Prefix for seeded usernames, tables and categories.")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--random-seed", type=int, default=42)
+        parser.add_argument("--flush", action="store_true", help="Delete previously seeded rows first.")
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["random_seed"])
+        self.prefix = options["prefix"]
+        self.batch = options["batch_size"]
+        self.now = timezone.now()
+        volumes = {
+            name: options[name] if options[name] is not None else max(1, int(default * options["scale"]))
+            for name, default in DEFAULT_VOLUMES.items()
+        }
+
+        if options["flush"]:
+            self.flush()
+        elif User.objects.filter(username__startswith=f"{self.prefix}_").exists():
+            raise CommandError(f"'{self.prefix}' data already exists; pass --flush to replace it.")
+
+        self.stdout.write("Seeding " + ", ".join(f"{n:,} {name}" for name, n in volumes.items()))
+        foods = self.seed_menu(volumes["foods"])
+        user_ids = self.seed_users(volumes["users"])
+        customer, _ = self.seed_bench_users()
+        self.seed_carts(user_ids, foods, customer)
+        self.seed_orders(user_ids, foods, volumes["orders"], volumes["notifications"], customer)
+        self.seed_bookings(user_ids, volumes["bookings"])
+
+        # bulk_create skips the signals that keep these in step.
+        OrderStatusCounter.objects.rebuild()
+        search.rebuild_index()
+        catalog.bump_version()
+        self.stdout.write(self.style.SUCCESS("Done."))
+
+    # ------------------------------------------------------------------
+
+    def flush(self):
+        self.stdout.write(f"Deleting '{self.prefix}' data...")
+        with transaction.atomic():
+            Notification.objects.filter(user__username__startswith=f"{self.prefix}_").delete()
+            OrderItem.objects.filter(order__user__username__startswith=f"{self.prefix}_").delete()
+            Order.objects.filter(user__username__startswith=f"{self.prefix}_").delete()
+            TableBooking.objects.filter(table__table_number__startswith=f"{self.prefix.upper()}-").delete()
+            User.objects.filter(username__startswith=f"{self.prefix}_").delete()
+            Table.objects.filter(table_number__startswith=f"{self.prefix.upper()}-").delete()
+            FoodItem.objects.filter(category__name__startswith=f"{self.prefix}:").delete()
+            Category.objects.filter(name__startswith=f"{self.prefix}:").delete()
+        OrderStatusCounter.objects.rebuild()
+
+    def seed_menu(self, count):
+        Category.objects.bulk_create(Category(name=f"{self.prefix}:{name}") for name in CATEGORIES)
+        categories = list(Category.objects.filter(name__startswith=f"{self.prefix}:"))
+        FoodItem.objects.bulk_create(
+            (
+                FoodItem(
+                    category=self.rng.choice(categories),
+                    name=f"{self.rng.choice(ADJECTIVES)} {self.rng.choice(DISHES)} {i:04}",
+                    price=Decimal(self.rng.randrange(80, 600)),
+                    description=" ".join(self.rng.choices(WORDS, k=self.rng.randint(20, 80))).capitalize() + ".",
+                    available=self.rng.random() > 0.05,
+                )
+                for i in range(count)
+            ),
+            batch_size=self.batch,
+        )
+        foods = list(
+            FoodItem.objects.filter(category__in=categories).values_list("id", "price")
+        )
+        self.stdout.write(f"  {len(foods):,} foods")
+        return foods
+
+    def seed_users(self, count):
+        password = make_password(None)  # unusable; bench logins use force_login
+        for start, size in _chunks(count, self.batch):
+            User.objects.bulk_create(
+                User(
+                    username=f"{self.prefix}_{i:07}",
+                    first_name=f"Guest{i}",
+                    password=password,
+                    date_joined=self.now - timedelta(days=self.rng.randrange(ORDER_HISTORY_DAYS)),
+                )
+                for i in range(start, start + size)
+            )
+        user_ids = list(
+            User.objects.filter(username__startswith=f"{self.prefix}_").values_list("id", flat=True)
+        )
+        self.stdout.write(f"  {len(user_ids):,} users")
+        return user_ids
+
+    def seed_bench_users(self):
+        customer = User.objects.create_user(f"{self.prefix}_customer", first_name="Bench")
+        staff = User.objects.create_user(f"{self.prefix}_staff", first_name="Bench", is_staff=True)
+        return customer, staff
+
+    def seed_carts(self, user_ids, foods, customer):
+        shoppers = self.rng.sample(user_ids, int(len(user_ids) * CART_SHARE))
+        Cart.objects.bulk_create(
+            (Cart(user_id=user_id) for user_id in shoppers + [customer.id]), batch_size=self.batch
+        )
+        carts = dict(Cart.objects.filter(user_id__in=shoppers + [customer.id]).values_list("user_id", "id"))
+
+        items = []
+        for user_id, cart_id in carts.items():
+            size = BENCH_CART_ITEMS if user_id == customer.id else self.rng.randint(1, 5)
+            for food_id, _ in self.rng.sample(foods, min(size, len(foods))):
+                items.append(CartItem(cart_id=cart_id, food_id=food_id, quantity=self.rng.randint(1, 3)))
+        CartItem.objects.bulk_create(items, batch_size=self.batch)
+        self.stdout.write(f"  {len(carts):,} carts")
+
+    def _order_state(self, created_at):
+        if self.now - created_at < OPEN_ORDER_AGE:
+            return self.rng.choice(["Pending", "Confirmed", "Ready"]), False
+        return ("Cancelled" if self.rng.random() < 0.05 else "Completed"), True
+
+    def seed_orders(self, user_ids, foods, count, notification_count, customer):
+        per_order = notification_count / max(count, 1)
+        owners = [customer.id] * min(BENCH_CUSTOMER_ORDERS, count)
+        timestamps = [
+            Order._meta.get_field("created_at"), Order._meta.get_field("updated_at"),
+            Notification._meta.get_field("created_at"),
+        ]
+        made = notified = 0
+
+        with explicit_timestamps(*timestamps):
+            for start, size in _chunks(count, self.batch):
+                orders, lines = [], {}
+                for i in range(start, start + size):
+                    user_id = owners[i] if i < len(owners) else self.rng.choice(user_ids)
+                    created_at = self.now - timedelta(seconds=self.rng.randrange(ORDER_HISTORY_DAYS * 86400))
+                    status, seen = self._order_state(created_at)
+                    picked = self.rng.sample(foods, min(self.rng.randint(1, 4), len(foods)))
+                    order_lines = [(food_id, price, self.rng.randint(1, 3)) for food_id, price in picked]
+                    total = sum(price * qty for _, price, qty in order_lines)
+                    number = next_order_number()
+                    lines[number] = order_lines
+                    orders.append(Order(
+                        user_id=user_id, order_number=number,
+                        total_amount=total, final_amount=total,
+                        payment_method=self.rng.choice(["UPI", "Card", "COD", "Wallet"]),
+                        payment_status="Completed" if status == "Completed" else "Pending",
+                        order_status=status, seen_by_user=seen,
+                        created_at=created_at, updated_at=created_at,
+                    ))
+
+                with transaction.atomic():
+                    Order.objects.bulk_create(orders)
+                    # Portable id lookup: MySQL does not return bulk ids.
+                    ids = dict(
+                        Order.objects.filter(order_number__in=lines).values_list("order_number", "id")
+                    )
+                    OrderItem.objects.bulk_create(
+                        (
+                            OrderItem(
+                                order_id=ids[number], food_id=food_id, quantity=qty,
+                                price=price, subtotal=price * qty,
+                            )
+                            for number, order_lines in lines.items()
+                            for food_id, price, qty in order_lines
+                        ),
+                        batch_size=self.batch,
+                    )
+
+                    notifications = []
+                    for order in orders:
+                        due = int((made + 1) * per_order) - notified
+                        for _ in range(min(due, notification_count - notified)):
+                            notifications.append(Notification(
+                                user_id=order.user_id, notification_type="order",
+                                title="Order update",
+                                message=f"Your order #{ids[order.order_number]} is {order.order_status.lower()}.",
+                                is_read=order.seen_by_user, order_id=ids[order.order_number],
+                                created_at=order.created_at,
+                            ))
+                            notified += 1
+                        made += 1
+                    Notification.objects.bulk_create(notifications, batch_size=self.batch)
+
+                self.stdout.write(f"  {made:,}/{count:,} orders")
+
+    def seed_bookings(self, user_ids, count):
+        Table.objects.bulk_create(
+            Table(
+                table_number=f"{self.prefix.upper()}-{n:02}", seats=self.rng.choice([2, 4, 6, 8]),
+                description="Seeded table",
+            )
+            for n in range(1, TABLES + 1)
+        )
+        tables = list(Table.objects.filter(table_number__startswith=f"{self.prefix.upper()}-"))
+        slot_times = [slot.time() for slot in day_slots(self.now.date())]
+
+        # Half the slots stay free; the window is mostly past, some ahead.
+        per_day = len(tables) * len(slot_times)
+        days = max(1, -(-count * 2 // per_day))
+        first_day = self.now.date() - timedelta(days=days * 3 // 4)
+        picks = self.rng.sample(range(days * per_day), min(count, days * per_day))
+
+        with explicit_timestamps(TableBooking._meta.get_field("created_at")):
+            for start, size in _chunks(len(picks), self.batch):
+                bookings = []
+                for pick in picks[start:start + size]:
+                    day, rest = divmod(pick, per_day)
+                    table, slot = divmod(rest, len(slot_times))
+                    date = first_day + timedelta(days=day)
+                    bookings.append(TableBooking(
+                        user_id=self.rng.choice(user_ids), table=tables[table],
+                        date=date, time=slot_times[slot],
+                        created_at=timezone.make_aware(datetime.combine(date, time(9))) - timedelta(days=self.rng.randint(0, 14)),
+                    ))
+                TableBooking.objects.bulk_create(bookings)
+        self.stdout.write(f"  {len(picks):,} bookings on {len(tables)} tables")
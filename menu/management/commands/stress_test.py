@@ -0,0 +1,269 @@
+import logging
+import threading
+import time
+from collections import Counter
+from datetime import datetime, time as clock, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.db.models import Sum
+from django.urls import reverse
+from django.utils import timezone
+
+from menu.instrumentation import record_queries
+from menu.models import Cart, CartItem, Category, FoodItem, Order, OrderItem, Table, TableBooking
+from menu.slots import BOOKING_BUFFER
+
+from ._browse import client_for
+from ._stats import percentile
+
+PREFIX = "stress"
+SCENARIOS = ["booking", "cart", "checkout"]
+# Booking attempts land this far either side of 19:00, so most of them
+# collide with each other inside the buffer.
+BOOKING_OFFSETS = [timedelta(minutes=m) for m in (-20, -10, 0, 10, 20)]
+LOCK_MARKERS = ("database is locked", "database table is locked", "Lock wait timeout", "Deadlock")
+
+
+def booking_violations(times, buffer=BOOKING_BUFFER):
+    """Pairs of start datetimes on one table that sit closer than ``buffer``."""
+    times = sorted(times)
+    return [(a, b) for a, b in zip(times, times[1:]) if b - a < buffer]
+
+
+class Outcome:
+    """What one scenario's requests did, collected from every thread."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = []
+        self.db_ms = []
+        self.results = Counter()
+        self.errors = Counter()
+        self.lock_errors = 0
+        self.seconds = 0.0
+        self.violations = []
+
+    def record(self, kind, response, elapsed, stats):
+        with self.lock:
+            self.latencies.append(elapsed * 1000)
+            self.db_ms.append(stats.seconds * 1000)
+            if response.status_code >= 500:
+                exc = response.exc_info[1] if response.exc_info else None
+                message = f"{type(exc).__name__}: {exc}" if exc else f"HTTP {response.status_code}"
+                self.errors[message[:120]] += 1
+                self.lock_errors += any(marker in message for marker in LOCK_MARKERS)
+                self.results[f"{kind}:error"] += 1
+            else:
+                self.results[kind] += 1
+
+
+class Command(BaseCommand):
+    help = (
+        "Fire concurrent bookings, cart increments and checkouts at the "
+        "database and report throughput, lock errors and broken invariants "
+        "(double bookings, lost or duplicated cart quantities)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=16)
+        parser.add_argument("--rounds", type=int, default=5, help="Synchronised bursts per scenario.")
+        parser.add_argument(
+            "--scenario", action="append", choices=SCENARIOS,
+            help="Run only this scenario (repeatable; default all).",
+        )
+        parser.add_argument("--keep", action="store_true", help="Leave the rows the run created.")
+
+    def handle(self, *args, **options):
+        if connection.vendor == "sqlite" and connection.is_in_memory_db():
+            raise CommandError("Threads cannot share an in-memory SQLite database.")
+
+        self.threads = options["threads"]
+        self.rounds = options["rounds"]
+        self.users, self.table, self.food = self.fixtures()
+        self.cleanup()
+
+        # Failures are tallied per scenario; one traceback each is noise.
+        request_log = logging.getLogger("django.request")
+        level = request_log.level
+        request_log.setLevel(logging.CRITICAL)
+
+        broken = 0
+        try:
+            for name in options["scenario"] or SCENARIOS:
+                outcome = getattr(self, f"run_{name}")()
+                self.report(name, outcome)
+                broken += len(outcome.violations)
+        finally:
+            request_log.setLevel(level)
+            if not options["keep"]:
+                self.cleanup()
+
+        if broken:
+            self.stderr.write(self.style.ERROR(f"{broken} invariant violation(s)."))
+            raise SystemExit(1)
+        self.stdout.write(self.style.SUCCESS("All invariants held."))
+
+    # ------------------------------------------------------------------
+
+    def fixtures(self):
+        users = []
+        for i in range(self.threads):
+            user, _ = User.objects.get_or_create(username=f"{PREFIX}_{i:03}", defaults={"first_name": "Stress"})
+            users.append(user)
+        table, _ = Table.objects.get_or_create(table_number=f"{PREFIX.upper()}-1", defaults={"seats": 4})
+        category, _ = Category.objects.get_or_create(name=f"{PREFIX}:Load")
+        food, _ = FoodItem.objects.get_or_create(
+            name=f"{PREFIX} dish", category=category,
+            defaults={"price": 100, "description": "Stress test item"},
+        )
+        return users, table, food
+
+    def cleanup(self):
+        TableBooking.objects.filter(table=self.table).delete()
+        Order.objects.filter(user__in=self.users).delete()
+        CartItem.objects.filter(cart__user__in=self.users).delete()
+
+    def burst(self, outcome, work, as_user=None):
+        """
+        Run ``work(index, round, client)`` on every thread at once, ``rounds``
+        times. Each thread has its own user unless ``as_user`` is given, in
+        which case they act like that user's open tabs.
+        """
+        users = [as_user] * self.threads if as_user else self.users
+        clients = [client_for(user, raise_request_exception=False) for user in users]
+        barrier = threading.Barrier(self.threads)
+
+        def worker(index):
+            try:
+                for round_no in range(self.rounds):
+                    barrier.wait()
+                    work(index, round_no, clients[index])
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(self.threads)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        outcome.seconds = time.perf_counter() - started
+
+    def request(self, outcome, kind, client, method, url, data=None):
+        with record_queries() as stats:
+            started = time.perf_counter()
+            response = getattr(client, method)(url, data)
+            elapsed = time.perf_counter() - started
+        outcome.record(kind, response, elapsed, stats)
+        return response
+
+    # ------------------------------------------------------------------
+
+    def run_booking(self):
+        """Every thread books the same table within minutes of the others."""
+        outcome = Outcome()
+        # Far enough ahead to be free; one fresh day per round.
+        first_day = timezone.localdate() + timedelta(days=400)
+
+        def work(index, round_no, client):
+            day = first_day + timedelta(days=round_no)
+            start = datetime.combine(day, clock(19)) + BOOKING_OFFSETS[index % len(BOOKING_OFFSETS)]
+            data = {"table": self.table.id, "date": day.isoformat(), "time": start.strftime("%H:%M")}
+            # Both booking paths share the conflict check; exercise both.
+            if index % 2:
+                url = reverse("table_detail", args=[self.table.id])
+            else:
+                url = reverse("book_table")
+            response = self.request(outcome, "attempt", client, "post", url, data)
+            if response.status_code == 302 and "/booking-success/" in response.url:
+                with outcome.lock:
+                    outcome.results["booked"] += 1
+
+        self.burst(outcome, work)
+
+        bookings = TableBooking.objects.filter(table=self.table).values_list("date", "time")
+        by_day = {}
+        for day, at in bookings:
+            by_day.setdefault(day, []).append(datetime.combine(day, at))
+        for times in by_day.values():
+            for a, b in booking_violations(times):
+                outcome.violations.append(f"double booking: {a:%Y-%m-%d %H:%M} and {b:%H:%M}")
+        return outcome
+
+    def run_cart(self):
+        """Every thread clicks "add" on the same food in one user's cart."""
+        outcome = Outcome()
+        owner = self.users[0]
+
+        def work(index, round_no, client):
+            response = self.request(outcome, "click", client, "get", reverse("add_to_cart", args=[self.food.id]))
+            if response.status_code == 302 and response.url == reverse("view_cart"):
+                with outcome.lock:
+                    outcome.results["added"] += 1
+
+        self.burst(outcome, work, as_user=owner)
+
+        quantity = CartItem.objects.filter(cart__user=owner, food=self.food).aggregate(q=Sum("quantity"))["q"] or 0
+        if quantity != outcome.results["added"]:
+            outcome.violations.append(
+                f"cart quantity {quantity} after {outcome.results['added']} successful adds "
+                f"({outcome.results['added'] - quantity} lost)"
+            )
+        return outcome
+
+    def run_checkout(self):
+        """Half the threads add to one cart while the other half check it out."""
+        outcome = Outcome()
+        owner = self.users[0]
+        cart, _ = Cart.objects.get_or_create(user=owner)
+        CartItem.objects.filter(cart=cart).delete()
+        CartItem.objects.create(cart=cart, food=self.food, quantity=1)
+
+        def work(index, round_no, client):
+            if index % 2:
+                response = self.request(outcome, "checkout", client, "post", reverse("process_payment"), {"payment_method": "UPI"})
+                if response.status_code == 302 and "/order-success/" in response.url:
+                    with outcome.lock:
+                        outcome.results["ordered"] += 1
+            else:
+                response = self.request(outcome, "click", client, "get", reverse("add_to_cart", args=[self.food.id]))
+                if response.status_code == 302 and response.url == reverse("view_cart"):
+                    with outcome.lock:
+                        outcome.results["added"] += 1
+
+        self.burst(outcome, work, as_user=owner)
+
+        # Every unit that went into the cart is either still there or on
+        # exactly one order.
+        in_cart = CartItem.objects.filter(cart__user=owner).aggregate(q=Sum("quantity"))["q"] or 0
+        ordered = OrderItem.objects.filter(order__user=owner).aggregate(q=Sum("quantity"))["q"] or 0
+        put_in = 1 + outcome.results["added"]
+        if in_cart + ordered != put_in:
+            outcome.violations.append(
+                f"{put_in} units added but {ordered} ordered + {in_cart} still in cart"
+            )
+        empty = Order.objects.filter(user=owner, orderitem__isnull=True).count()
+        if empty:
+            outcome.violations.append(f"{empty} order(s) without lines")
+        return outcome
+
+    # ------------------------------------------------------------------
+
+    def report(self, name, outcome):
+        total = len(outcome.latencies)
+        self.stdout.write(self.style.MIGRATE_HEADING(f"{name}: {self.threads} threads x {self.rounds} rounds"))
+        self.stdout.write(
+            f"  {total} requests in {outcome.seconds:.2f}s ({total / outcome.seconds:.1f} req/s); "
+            f"latency p50 {percentile(outcome.latencies, 50):.1f} / p99 {percentile(outcome.latencies, 99):.1f} ms; "
+            f"db time p50 {percentile(outcome.db_ms, 50):.1f} / p99 {percentile(outcome.db_ms, 99):.1f} ms"
+        )
+        self.stdout.write("  " + ", ".join(f"{k}={v}" for k, v in sorted(outcome.results.items())))
+        self.stdout.write(f"  lock errors: {outcome.lock_errors}")
+        for message, count in outcome.errors.most_common():
+            self.stdout.write(self.style.WARNING(f"  {count} x {message}"))
+        for violation in outcome.violations:
+            self.stdout.write(self.style.ERROR(f"  VIOLATION {violation}"))
+        if not outcome.violations:
+            self.stdout.write(self.style.SUCCESS("  invariants held"))
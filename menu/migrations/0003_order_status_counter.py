@@ -0,0 +1,33 @@
+# Generated by Django 6.0.1 on 2026-10-18 16:45
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def seed_counters(apps, schema_editor):
+    Order = apps.get_model('menu', 'Order')
+    OrderStatusCounter = apps.get_model('menu', 'OrderStatusCounter')
+    counts = dict(
+        Order.objects.order_by().values_list('order_status').annotate(total=Count('id'))
+    )
+    for status in ('Pending', 'Confirmed', 'Ready', 'Completed', 'Cancelled'):
+        OrderStatusCounter.objects.create(status=status, count=counts.get(status, 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0002_alter_tablebooking_table'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderStatusCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(max_length=20, unique=True)),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 6.0.1 on 2026-10-18 16:45
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_ratings(apps, schema_editor):
+    Table = apps.get_model('menu', 'Table')
+    for table in Table.objects.annotate(total=Sum('reviews__rating'), n=Count('reviews')):
+        Table.objects.filter(pk=table.pk).update(rating_sum=table.total or 0, rating_count=table.n)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0003_order_status_counter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='table',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='table',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_ratings, migrations.RunPython.noop),
+    ]
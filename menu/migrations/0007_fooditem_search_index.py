@@ -0,0 +1,53 @@
+# Generated by Django 6.0.1 on 2026-10-18 17:05
+
+from django.db import migrations
+
+SQLITE_CREATE = (
+    "CREATE VIRTUAL TABLE menu_fooditem_search USING fts5("
+    "name, description, category, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+)
+
+MYSQL_CREATE = (
+    "CREATE TABLE menu_fooditem_search ("
+    "food_id BIGINT NOT NULL PRIMARY KEY, "
+    "name VARCHAR(200) NOT NULL, "
+    "description LONGTEXT NOT NULL, "
+    "category VARCHAR(100) NOT NULL, "
+    "FULLTEXT KEY menu_fooditem_search_name (name), "
+    "FULLTEXT KEY menu_fooditem_search_all (name, description, category)"
+    ") ENGINE=InnoDB DEFAULT CHARSET=utf8mb4"
+)
+
+BACKFILL = (
+    "INSERT INTO menu_fooditem_search ({key}, name, description, category) "
+    "SELECT f.id, f.name, f.description, COALESCE(c.name, '') "
+    "FROM menu_fooditem f LEFT JOIN menu_category c ON c.id = f.category_id"
+)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(SQLITE_CREATE)
+        schema_editor.execute(BACKFILL.format(key='rowid'))
+    elif vendor == 'mysql':
+        schema_editor.execute(MYSQL_CREATE)
+        schema_editor.execute(BACKFILL.format(key='food_id'))
+    # Other databases search with icontains (menu.search.FallbackBackend).
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'mysql'):
+        schema_editor.execute('DROP TABLE menu_fooditem_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0006_fooditem_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
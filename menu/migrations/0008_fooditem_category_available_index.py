@@ -0,0 +1,17 @@
+# Generated by Django 6.0.1 on 2026-10-18 17:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0007_fooditem_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='fooditem',
+            index=models.Index(fields=['category', 'available'], name='menu_food_category_avail_idx'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 6.0.1 on 2026-10-18 17:05
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def merge_duplicate_cart_items(apps, schema_editor):
+    # Fold repeated (cart, food) rows into the oldest one so the unique
+    # constraint below can be added.
+    CartItem = apps.get_model('menu', 'CartItem')
+    duplicates = (
+        CartItem.objects.order_by().values('cart_id', 'food_id')
+        .annotate(rows=Count('id')).filter(rows__gt=1)
+    )
+    for pair in duplicates:
+        items = list(CartItem.objects.filter(
+            cart_id=pair['cart_id'], food_id=pair['food_id']
+        ).order_by('id'))
+        keep = items[0]
+        keep.quantity = sum(item.quantity for item in items)
+        keep.save(update_fields=['quantity'])
+        CartItem.objects.filter(id__in=[item.id for item in items[1:]]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0008_fooditem_category_available_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_cart_items, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'is_read', '-created_at'], name='menu_notif_user_read_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['user', '-created_at'], name='menu_order_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['order_status', '-created_at'], name='menu_order_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['-created_at'], name='menu_order_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tablebooking',
+            index=models.Index(fields=['user', '-date'], name='menu_booking_user_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='cartitem',
+            constraint=models.UniqueConstraint(fields=('cart', 'food'), name='menu_cartitem_unique_food'),
+        ),
+    ]
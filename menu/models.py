@@ -1,4 +1,7 @@
-from django.db import models
+import time
+
+from django.db import models, transaction
+from django.db.models import Count, F, Sum
 from django.contrib.auth.models import User
 
 
@@ -24,11 +27,53 @@ class FoodItem(models.Model):
     description = models.TextField()
     image = models.ImageField(upload_to='food_images/', blank=True, null=True)
     available = models.BooleanField(default=True)
+    # Part of the order_food card's fragment cache key.
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # order_food pages through one category's available items.
+            models.Index(fields=["category", "available"], name="menu_food_category_avail_idx"),
+        ]
 
     def __str__(self):
         return self.name
 
 
+# =========================
+# MENU VERSION
+# =========================
+class MenuVersionManager(models.Manager):
+    def current(self):
+        row = self.filter(pk=1)
+        version = row.values_list("version", flat=True).first()
+        if version is None:
+            self.bump()
+            version = row.values_list("version", flat=True).get()
+        return version
+
+    def bump(self):
+        """Move the menu to a new version in the caller's transaction."""
+        if not self.filter(pk=1).update(version=F("version") + 1):
+            # Seeded from the clock so a recreated row never resurrects
+            # catalog entries still cached under an older number.
+            self.get_or_create(pk=1, defaults={"version": time.time_ns()})
+
+
+class MenuVersion(models.Model):
+    """
+    The single row whose number keys every cached copy of the menu (see
+    menu/catalog.py). It lives in the database, not the cache, so eviction
+    cannot reset it and concurrent bumps are atomic.
+    """
+    version = models.BigIntegerField(default=0)
+
+    objects = MenuVersionManager()
+
+    def __str__(self):
+        return f"Menu version {self.version}"
+
+
 # =========================
 # CART
 # =========================
@@ -50,6 +95,11 @@ class CartItem(models.Model):
     quantity = models.PositiveIntegerField(default=1)
     added_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["cart", "food"], name="menu_cartitem_unique_food"),
+        ]
+
     def __str__(self):
         return f"{self.quantity} x {self.food.name}"
 
@@ -121,6 +171,40 @@ class Order(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # my_orders and the unread badge.
+            models.Index(fields=['user', '-created_at'], name='menu_order_user_created_idx'),
+            # admin_orders, filtered by status and unfiltered.
+            models.Index(fields=['order_status', '-created_at'], name='menu_order_status_created_idx'),
+            models.Index(fields=['-created_at'], name='menu_order_created_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        update_fields = kwargs.get("update_fields")
+        moves_status = not (
+            "order_status" in self.get_deferred_fields()
+            or (update_fields is not None and "order_status" not in update_fields)
+        )
+
+        with transaction.atomic():
+            old_status = None
+            if not adding and moves_status:
+                # Read the stored status under the row lock (SQLite's
+                # IMMEDIATE transactions already serialise writers), so a
+                # stale or partially loaded instance, or a concurrent save,
+                # never moves the counters from the wrong status.
+                old_status = (
+                    Order.objects.select_for_update()
+                    .filter(pk=self.pk)
+                    .values_list("order_status", flat=True)
+                    .first()
+                )
+            super().save(*args, **kwargs)
+            if moves_status and old_status != self.order_status:
+                if old_status:
+                    OrderStatusCounter.objects.adjust(old_status, -1)
+                OrderStatusCounter.objects.adjust(self.order_status, 1)
 
 
 class OrderItem(models.Model):
@@ -134,9 +218,105 @@ class OrderItem(models.Model):
         return f"{self.quantity} x {self.food.name} in Order #{self.order.order_number}"
 
 
+# =========================
+# ORDER STATUS COUNTERS
+# =========================
+class OrderStatusCounterManager(models.Manager):
+    def adjust(self, status, delta):
+        updated = self.filter(status=status).update(count=F("count") + delta)
+        if not updated:
+            self.get_or_create(status=status)
+            self.filter(status=status).update(count=F("count") + delta)
+
+    def as_dict(self):
+        counts = {status: 0 for status, _ in Order.STATUS_CHOICES}
+        counts.update(self.values_list("status", "count"))
+        return counts
+
+    def rebuild(self, commit=True):
+        """
+        Recount menu_order and return {status: (stored, actual)} for every
+        counter that had drifted. With commit=False only the report is made.
+        """
+        with transaction.atomic():
+            stored = {
+                counter.status: counter.count
+                for counter in self.select_for_update()
+            }
+            actual = {status: 0 for status, _ in Order.STATUS_CHOICES}
+            actual.update(
+                Order.objects.order_by()
+                .values_list("order_status")
+                .annotate(total=Count("id"))
+            )
+
+            drift = {}
+            for status, count in actual.items():
+                if stored.get(status) != count:
+                    drift[status] = (stored.get(status), count)
+                    if commit:
+                        self.update_or_create(
+                            status=status, defaults={"count": count}
+                        )
+            return drift
+
+
+class OrderStatusCounter(models.Model):
+    """
+    Running number of orders per status, moved in the same transaction as
+    the order write so the admin badges never have to COUNT(*) menu_order.
+    """
+    status = models.CharField(max_length=20, unique=True)
+    count = models.IntegerField(default=0)
+
+    objects = OrderStatusCounterManager()
+
+    def __str__(self):
+        return f"{self.status}: {self.count}"
+
+
 # =========================
 # TABLE (ADMIN CONTROLLED)
 # =========================
+class TableManager(models.Manager):
+    def shift_rating(self, table_id, rating, count):
+        """Add ``count`` reviews of ``rating`` stars (count may be -1) to a table."""
+        self.filter(pk=table_id).update(
+            rating_sum=F("rating_sum") + rating * count,
+            rating_count=F("rating_count") + count,
+        )
+
+    def rebuild_ratings(self, commit=True):
+        """
+        Recount reviews and return {table_number: (stored, actual)} as
+        (sum, count) pairs for every table that had drifted. With
+        commit=False only the report is made.
+        """
+        with transaction.atomic():
+            stored = {
+                pk: (number, (rating_sum, rating_count))
+                for pk, number, rating_sum, rating_count in self.select_for_update()
+                .values_list("pk", "table_number", "rating_sum", "rating_count")
+            }
+            actual = {
+                table_id: (total, n)
+                for table_id, total, n in TableReview.objects.order_by()
+                .values_list("table_id")
+                .annotate(total=Sum("rating"), n=Count("id"))
+            }
+
+            drift = {}
+            for pk, (number, counts) in stored.items():
+                expected = actual.get(pk, (0, 0))
+                if counts != expected:
+                    drift[number] = (counts, expected)
+                    if commit:
+                        self.filter(pk=pk).update(
+                            rating_sum=expected[0], rating_count=expected[1]
+                        )
+            return drift
+
+
 class Table(models.Model):
     table_number = models.CharField(max_length=10, unique=True)
     seats = models.PositiveIntegerField()
@@ -151,6 +331,13 @@ class Table(models.Model):
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Maintained by TableReview.save()/delete so listings never aggregate
+    # reviews; repair with `manage.py rebuild_table_ratings`.
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = TableManager()
+
     class Meta:
         ordering = ["table_number"]
 
@@ -159,17 +346,13 @@ class Table(models.Model):
 
     @property
     def average_rating(self):
-        reviews = self.reviews.all()
-        if reviews.exists():
-            return round(
-                sum(review.rating for review in reviews) / reviews.count(),
-                1
-            )
+        if self.rating_count:
+            return round(self.rating_sum / self.rating_count, 1)
         return 0
 
     @property
     def total_reviews(self):
-        return self.reviews.count()
+        return self.rating_count
 
 
 
@@ -186,13 +369,37 @@ class TableBooking(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
+        # Also the index behind the slot conflict checks in menu/slots.py.
         unique_together = ('table', 'date', 'time')
         ordering = ['-created_at']
+        indexes = [
+            # my_bookings
+            models.Index(fields=['user', '-date'], name='menu_booking_user_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - Table {self.table.table_number} on {self.date} {self.time}"
 
 
+class TableDay(models.Model):
+    """
+    A lock row per table and date that has taken bookings.
+
+    slots.reserve() updates the rows its buffer window touches before it
+    checks for conflicts, so bookings for one table and day take turns
+    while other tables and days go ahead in parallel.
+    """
+    table = models.ForeignKey(Table, on_delete=models.CASCADE, related_name="days")
+    date = models.DateField()
+    version = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('table', 'date')
+
+    def __str__(self):
+        return f"Table {self.table_id} on {self.date}"
+
+
 # =========================
 # TABLE REVIEW
 # =========================
@@ -218,6 +425,36 @@ class TableReview(models.Model):
     def __str__(self):
         return f"Table {self.table.table_number} - {self.rating}⭐ by {self.user.username}"
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        if "rating" not in self.get_deferred_fields():
+            self.rating = int(self.rating)
+        update_fields = kwargs.get("update_fields")
+        moves_rating = update_fields is None or bool(
+            {"table", "table_id", "rating"} & set(update_fields)
+        )
+
+        with transaction.atomic():
+            old = None
+            if not adding and moves_rating:
+                # Like Order.save: read what is stored under the row lock, so
+                # stale or partially loaded instances move the right numbers.
+                old = self.stored_rating(lock=True)
+            super().save(*args, **kwargs)
+            if moves_rating:
+                new = (self.table_id, self.rating) if adding else self.stored_rating()
+                if old != new:
+                    if old:
+                        Table.objects.shift_rating(*old, -1)
+                    Table.objects.shift_rating(*new, 1)
+
+    def stored_rating(self, lock=False):
+        """The (table_id, rating) pair in the database, or None."""
+        rows = TableReview.objects.filter(pk=self.pk)
+        if lock:
+            rows = rows.select_for_update()
+        return rows.values_list("table_id", "rating").first()
+
 
 # =========================
 # NOTIFICATIONS
@@ -255,6 +492,51 @@ class Notification(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # The notifications page and the unread badge.
+            models.Index(fields=['user', 'is_read', '-created_at'], name='menu_notif_user_read_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.user.username}"
+
+
+# =========================
+# NOTIFICATION OUTBOX
+# =========================
+class NotificationOutbox(models.Model):
+    """
+    Notifications waiting to be delivered.
+
+    Request handlers enqueue a row here in the same transaction as the change
+    that caused it; `manage.py process_notification_outbox` turns queued rows
+    into Notification rows in batches.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    notification_type = models.CharField(
+        max_length=20,
+        choices=Notification.NOTIFICATION_TYPES
+    )
+    title = models.CharField(max_length=200)
+    message = models.TextField()
+
+    order = models.ForeignKey(
+        Order,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True
+    )
+    booking = models.ForeignKey(
+        TableBooking,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+
+    def __str__(self):
+        return f"Queued: {self.title} - {self.user_id}"
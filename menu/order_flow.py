@@ -0,0 +1,153 @@
+"""
+Order lifecycle state machine.
+
+TRANSITIONS is the only way an order moves once placed (OrderAdmin edits
+aside): each action lists the states it may start from, the state it ends
+in and the notification it sends. Nothing moves backwards, so a Completed
+order can never return to Confirmed.
+
+Moves are compare-and-swap writes: ``UPDATE ... WHERE order_status =
+<expected>`` touching only the changed columns. When two terminals act on
+the same order, exactly one UPDATE matches and the other reports that it
+lost; nothing reads the whole row first. ``transition`` moves one order,
+``bulk_transition`` many at once with one UPDATE and one outbox insert.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import badges, events, outbox
+from .models import Order, OrderStatusCounter
+
+DEFAULT_ESTIMATED_TIME = "20 minutes"
+
+TRANSITIONS = {
+    "confirm": {
+        "from": ("Pending",),
+        "to": "Confirmed",
+        "title": "Order Confirmed! ✅",
+        "message": "Your order #{id} has been confirmed. Estimated time: {estimated_time}.",
+    },
+    "ready": {
+        "from": ("Confirmed",),
+        "to": "Ready",
+        "title": "Order Ready! 🍕",
+        "message": "Great news! Your order #{id} is ready for pickup or delivery.",
+    },
+    "complete": {
+        "from": ("Ready",),
+        "to": "Completed",
+        "title": "Order Completed! ✨",
+        "message": "Order #{id} has been marked as completed. Hope you enjoy your meal!",
+    },
+    "cancel": {
+        "from": ("Pending", "Confirmed"),
+        "to": "Cancelled",
+        "title": "Order Cancelled ❌",
+        "message": "We regret to inform you that your order #{id} has been cancelled.",
+    },
+}
+
+
+def _changes(action, step, estimated_time):
+    changes = {
+        "order_status": step["to"],
+        "seen_by_user": False,
+        # update() skips auto_now; live order events key off updated_at.
+        "updated_at": timezone.now(),
+    }
+    if action == "confirm":
+        changes["estimated_time"] = estimated_time
+    return changes
+
+
+def _notification(step, order_id, user_id, estimated_time):
+    return {
+        "user_id": user_id,
+        "title": step["title"],
+        "message": step["message"].format(
+            id=order_id, estimated_time=estimated_time
+        ),
+        "order_id": order_id,
+    }
+
+
+def transition(order_id, action, expected=None, estimated_time=None):
+    """
+    Apply ``action`` to one order and return True if this call won.
+
+    ``expected`` is the status the caller last saw. The move only happens
+    if the order is still in that state; without it, any of the action's
+    source states is accepted. False means the order is gone or another
+    writer moved it first.
+    """
+    step = TRANSITIONS[action]
+    if expected is not None and expected not in step["from"]:
+        return False
+    if action == "confirm":
+        estimated_time = estimated_time or DEFAULT_ESTIMATED_TIME
+
+    changes = _changes(action, step, estimated_time)
+    with transaction.atomic():
+        for source in (expected,) if expected else step["from"]:
+            if Order.objects.filter(id=order_id, order_status=source).update(**changes):
+                break
+        else:
+            return False
+
+        OrderStatusCounter.objects.adjust(source, -1)
+        OrderStatusCounter.objects.adjust(step["to"], 1)
+
+        # Only the winner pays for this single-column read.
+        user_id = Order.objects.filter(id=order_id).values_list("user_id", flat=True).get()
+        outbox.enqueue(**_notification(step, order_id, user_id, estimated_time))
+        transaction.on_commit(lambda: _announce({user_id}))
+
+    return True
+
+
+def bulk_transition(action, order_ids, estimated_time=None):
+    """
+    Move every order in ``order_ids`` that is currently in one of the
+    action's source states. Orders in any other state are left alone.
+
+    Returns the ids of the orders that were moved.
+    """
+    step = TRANSITIONS[action]
+    if action == "confirm":
+        estimated_time = estimated_time or DEFAULT_ESTIMATED_TIME
+
+    with transaction.atomic():
+        candidates = list(
+            Order.objects.select_for_update()
+            .filter(id__in=order_ids, order_status__in=step["from"])
+            .values_list("id", "user_id", "order_status")
+        )
+        if not candidates:
+            return []
+        ids = [order_id for order_id, _, _ in candidates]
+
+        Order.objects.filter(
+            id__in=ids, order_status__in=step["from"]
+        ).update(**_changes(action, step, estimated_time))
+
+        for status, moved in Counter(status for _, _, status in candidates).items():
+            OrderStatusCounter.objects.adjust(status, -moved)
+        OrderStatusCounter.objects.adjust(step["to"], len(ids))
+
+        outbox.enqueue_many(
+            _notification(step, order_id, user_id, estimated_time)
+            for order_id, user_id, _ in candidates
+        )
+
+        user_ids = {user_id for _, user_id, _ in candidates}
+        transaction.on_commit(lambda: _announce(user_ids))
+
+    return ids
+
+
+def _announce(user_ids):
+    badges.invalidate(*user_ids)
+    for user_id in user_ids:
+        events.publish_order_change(user_id)
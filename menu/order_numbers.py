@@ -0,0 +1,132 @@
+"""
+Order number generation.
+
+Order numbers used to be "ORD" plus 8 random digits. With a unique index,
+the birthday bound makes collisions, and so IntegrityErrors, a matter of
+volume. The default generator instead issues k-sorted ids that cannot
+collide and need no retry or extra query:
+
+    42 bits  milliseconds since ORDER_EPOCH
+     6 bits  ORDER_NUMBER_NODE_ID (unique per machine, 0-63)
+    22 bits  process id (unique per live worker on a machine)
+    10 bits  per-process sequence within the same millisecond
+
+The 80 bits are written as 16 Crockford base32 characters after the "ORD"
+prefix. The width is fixed, so numbers sort by creation time, new rows land
+at the right-hand end of the unique index, and no number can clash with the
+older 11-character ones.
+
+The node id has no default outside DEBUG: a missing ORDER_NUMBER_NODE_ID
+fails the system checks and the first checkout rather than letting every
+node silently share id 0.
+
+The generator is pluggable through the ORDER_NUMBER_GENERATOR setting, a
+dotted path to a zero-argument callable that returns the number.
+"""
+import os
+import threading
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.core import checks
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+PREFIX = "ORD"
+ORDER_EPOCH_MS = 1767225600000  # 2026-01-01T00:00:00Z
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+NODE_BITS = 6
+PID_BITS = 22
+SEQUENCE_BITS = 10
+WIDTH = 16
+
+
+def _encode(value):
+    chars = []
+    for _ in range(WIDTH):
+        value, digit = divmod(value, 32)
+        chars.append(ALPHABET[digit])
+    return "".join(reversed(chars))
+
+
+def configured_node_id():
+    """settings.ORDER_NUMBER_NODE_ID as an int; ImproperlyConfigured if unusable."""
+    value = getattr(settings, "ORDER_NUMBER_NODE_ID", None)
+    if value is None or str(value).strip() == "":
+        raise ImproperlyConfigured(
+            "ORDER_NUMBER_NODE_ID is not set. Give every node that takes "
+            "orders its own id between 0 and 63."
+        )
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ImproperlyConfigured(f"ORDER_NUMBER_NODE_ID must be an integer, not {value!r}.")
+
+
+def check_node_id(app_configs, **kwargs):
+    """System check: the default generator needs a node id in range."""
+    if getattr(settings, "ORDER_NUMBER_GENERATOR", None):
+        return []
+    try:
+        node_id = configured_node_id()
+    except ImproperlyConfigured as exc:
+        return [checks.Error(str(exc), id="menu.E001")]
+    if not 0 <= node_id < 1 << NODE_BITS:
+        return [checks.Error(
+            f"ORDER_NUMBER_NODE_ID must be between 0 and {(1 << NODE_BITS) - 1}.",
+            id="menu.E001",
+        )]
+    return []
+
+
+class TimeOrderedGenerator:
+    def __init__(self, node_id=None):
+        if node_id is None:
+            node_id = configured_node_id()
+        if not 0 <= node_id < 1 << NODE_BITS:
+            raise ValueError(f"ORDER_NUMBER_NODE_ID must be between 0 and {(1 << NODE_BITS) - 1}")
+        self.node_id = node_id
+        self._lock = threading.Lock()
+        self._last_ms = 0
+        self._sequence = 0
+
+    def _next_tick(self):
+        with self._lock:
+            now_ms = time.time_ns() // 1_000_000 - ORDER_EPOCH_MS
+            # Never step backwards if the wall clock is adjusted.
+            now_ms = max(now_ms, self._last_ms)
+            if now_ms == self._last_ms:
+                self._sequence += 1
+                if self._sequence >> SEQUENCE_BITS:
+                    # Sequence exhausted for this millisecond: borrow the next one.
+                    now_ms += 1
+                    self._sequence = 0
+            else:
+                self._sequence = 0
+            self._last_ms = now_ms
+            return now_ms, self._sequence
+
+    def __call__(self):
+        ms, sequence = self._next_tick()
+        # Read per call: preloaded gunicorn workers fork after import.
+        pid = os.getpid() & ((1 << PID_BITS) - 1)
+
+        value = ms
+        value = (value << NODE_BITS) | self.node_id
+        value = (value << PID_BITS) | pid
+        value = (value << SEQUENCE_BITS) | sequence
+        return PREFIX + _encode(value)
+
+
+@lru_cache(maxsize=None)
+def get_generator():
+    path = getattr(settings, "ORDER_NUMBER_GENERATOR", None)
+    if path:
+        return import_string(path)
+    return TimeOrderedGenerator()
+
+
+def next_order_number():
+    return get_generator()()
@@ -0,0 +1,74 @@
+"""
+Transactional outbox for customer notifications.
+
+Order transitions (menu/order_flow.py) call ``enqueue`` or ``enqueue_many``
+inside the transaction that changes the order, so a notification is queued
+exactly when the change commits. The outbox worker
+(`manage.py process_notification_outbox`) calls ``drain`` to move queued rows
+into Notification with one bulk insert and one delete per batch.
+"""
+from django.db import connection, transaction
+
+from . import badges
+from .models import Notification, NotificationOutbox
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def _row(user_id, title, message, order_id=None, booking_id=None,
+         notification_type="order"):
+    return NotificationOutbox(
+        user_id=user_id,
+        notification_type=notification_type,
+        title=title,
+        message=message,
+        order_id=order_id,
+        booking_id=booking_id,
+    )
+
+
+def enqueue(user_id, title, message, order_id=None, booking_id=None,
+            notification_type="order"):
+    row = _row(user_id, title, message, order_id, booking_id, notification_type)
+    row.save()
+    return row
+
+
+def enqueue_many(notifications):
+    """Queue several notifications, each a dict of ``enqueue`` arguments, with one insert."""
+    return NotificationOutbox.objects.bulk_create(
+        [_row(**notification) for notification in notifications]
+    )
+
+
+def drain(batch_size=DEFAULT_BATCH_SIZE):
+    """Deliver up to ``batch_size`` queued notifications; return how many."""
+    with transaction.atomic():
+        queued = NotificationOutbox.objects.order_by("id")
+        if connection.features.has_select_for_update_skip_locked:
+            # Lets several workers drain side by side on MySQL/PostgreSQL.
+            queued = queued.select_for_update(skip_locked=True)
+        batch = list(queued[:batch_size])
+        if not batch:
+            return 0
+
+        Notification.objects.bulk_create([
+            Notification(
+                user_id=event.user_id,
+                notification_type=event.notification_type,
+                title=event.title,
+                message=event.message,
+                order_id=event.order_id,
+                booking_id=event.booking_id,
+            )
+            for event in batch
+        ])
+        NotificationOutbox.objects.filter(
+            id__in=[event.id for event in batch]
+        ).delete()
+
+        # bulk_create sends no post_save, so refresh the badges here.
+        user_ids = [event.user_id for event in batch]
+        transaction.on_commit(lambda: badges.invalidate(*user_ids))
+
+    return len(batch)
@@ -0,0 +1,68 @@
+"""
+Keyset ("seek") pagination.
+
+OFFSET pagination makes the database walk and discard every earlier row, so
+deep pages get slower as history grows. A keyset page instead starts right
+after the last row the client saw, and costs the same on page 1 and page
+1000. ``keyset_page`` walks newest-first listings on the ``(created_at, id)``
+pair; ``id_page`` walks tables without a timestamp in id order.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db.models import Q
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def encode_cursor(obj):
+    delta = obj.created_at - EPOCH
+    micros = (delta.days * 86400 + delta.seconds) * 10**6 + delta.microseconds
+    return f"{micros}-{obj.pk}"
+
+
+def decode_cursor(cursor):
+    try:
+        micros, pk = (int(part) for part in cursor.split("-", 1))
+    except (AttributeError, ValueError):
+        return None
+    return EPOCH + timedelta(microseconds=micros), pk
+
+
+def keyset_page(queryset, cursor=None, size=25):
+    """
+    Return ``(rows, next_cursor)`` for one page of ``queryset``, newest first.
+
+    ``next_cursor`` is None on the last page. An invalid cursor is treated
+    as the first page.
+    """
+    queryset = queryset.order_by("-created_at", "-pk")
+    position = decode_cursor(cursor) if cursor else None
+    if position:
+        created_at, pk = position
+        queryset = queryset.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk)
+        )
+
+    rows = list(queryset[:size + 1])
+    if len(rows) > size:
+        rows = rows[:size]
+        return rows, encode_cursor(rows[-1])
+    return rows, None
+
+
+def id_page(queryset, after=None, size=25):
+    """
+    Return ``(rows, next_cursor)`` for one page of ``queryset`` in id order.
+
+    ``next_cursor`` is None on the last page. An invalid cursor is treated
+    as the first page.
+    """
+    queryset = queryset.order_by("pk")
+    if after and after.isdigit():
+        queryset = queryset.filter(pk__gt=int(after))
+
+    rows = list(queryset[:size + 1])
+    if len(rows) > size:
+        rows = rows[:size]
+        return rows, str(rows[-1].pk)
+    return rows, None
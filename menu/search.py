@@ -0,0 +1,183 @@
+"""
+Full-text menu search.
+
+Food names, descriptions and category names are copied into a side table
+that carries a real full-text index: an FTS5 virtual table on SQLite and an
+InnoDB FULLTEXT table on MySQL. Queries hit that index instead of scanning
+``FoodItem`` with ``icontains``, so lookups stay flat as the menu grows.
+Other databases get no side table and fall back to ``icontains``.
+
+Every word in a query must match, and the last letters may be missing
+("biri" finds "Biriyani"). Hits in the name rank above hits in the category,
+which rank above hits in the description.
+
+The index is kept in sync by signals (menu/signals.py) inside the same
+transaction as the change. ``python manage.py rebuild_search_index``
+rebuilds it from scratch.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, Value, When
+
+from .models import FoodItem
+
+INDEX_TABLE = "menu_fooditem_search"
+MAX_RESULTS = 50
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+# The indexed text for a set of foods, in (id, name, description, category)
+# column order.
+_SOURCE_SQL = (
+    "SELECT f.id, f.name, f.description, COALESCE(c.name, '') "
+    "FROM menu_fooditem f LEFT JOIN menu_category c ON c.id = f.category_id"
+)
+
+
+def _terms(query):
+    return _WORD.findall(query.lower())[:10]
+
+
+def _placeholders(values):
+    return ", ".join(["%s"] * len(values))
+
+
+class SearchBackend:
+    """Keeps the side table in step with FoodItem and answers queries."""
+
+    key_column = "food_id"
+
+    def unindex(self, cursor, food_ids):
+        cursor.execute(
+            f"DELETE FROM {INDEX_TABLE} WHERE {self.key_column} IN ({_placeholders(food_ids)})",
+            food_ids,
+        )
+
+    def index(self, cursor, food_ids):
+        self.unindex(cursor, food_ids)
+        cursor.execute(
+            f"INSERT INTO {INDEX_TABLE} ({self.key_column}, name, description, category) "
+            f"{_SOURCE_SQL} WHERE f.id IN ({_placeholders(food_ids)})",
+            food_ids,
+        )
+
+    def rebuild(self, cursor):
+        cursor.execute(f"DELETE FROM {INDEX_TABLE}")
+        cursor.execute(
+            f"INSERT INTO {INDEX_TABLE} ({self.key_column}, name, description, category) "
+            f"{_SOURCE_SQL}"
+        )
+
+    def search(self, cursor, terms, limit):
+        raise NotImplementedError
+
+
+class SQLiteBackend(SearchBackend):
+    key_column = "rowid"
+
+    def search(self, cursor, terms, limit):
+        # Quoting keeps FTS5 operators in user input inert; * is a prefix match.
+        match = " ".join('"%s"*' % term.replace('"', '""') for term in terms)
+        cursor.execute(
+            f"SELECT rowid FROM {INDEX_TABLE} WHERE {INDEX_TABLE} MATCH %s "
+            f"ORDER BY bm25({INDEX_TABLE}, 10.0, 1.0, 5.0) LIMIT %s",
+            [match, limit],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+class MySQLBackend(SearchBackend):
+    def search(self, cursor, terms, limit):
+        # Boolean mode: + makes every word required, * is a prefix match.
+        match = " ".join(f"+{term}*" for term in terms)
+        cursor.execute(
+            f"SELECT food_id FROM {INDEX_TABLE} "
+            f"WHERE MATCH(name, description, category) AGAINST (%s IN BOOLEAN MODE) "
+            f"ORDER BY MATCH(name) AGAINST (%s IN BOOLEAN MODE) * 3 "
+            f"+ MATCH(name, description, category) AGAINST (%s IN BOOLEAN MODE) DESC "
+            f"LIMIT %s",
+            [match, match, match, limit],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+class FallbackBackend(SearchBackend):
+    """No index to keep: every query scans FoodItem with ``icontains``."""
+
+    def unindex(self, cursor, food_ids):
+        pass
+
+    def index(self, cursor, food_ids):
+        pass
+
+    def rebuild(self, cursor):
+        pass
+
+    def search(self, cursor, terms, limit):
+        matches = Q()
+        for term in terms:
+            matches &= (
+                Q(name__icontains=term)
+                | Q(description__icontains=term)
+                | Q(category__name__icontains=term)
+            )
+        # Same order as the real indexes: name, then category, then description.
+        rank = Case(
+            When(name__icontains=terms[0], then=Value(0)),
+            When(category__name__icontains=terms[0], then=Value(1)),
+            default=Value(2),
+            output_field=IntegerField(),
+        )
+        return list(
+            FoodItem.objects.filter(matches)
+            .order_by(rank, "name", "pk")
+            .values_list("pk", flat=True)[:limit]
+        )
+
+
+BACKENDS = {
+    "sqlite": SQLiteBackend,
+    "mysql": MySQLBackend,
+}
+
+
+def get_backend():
+    return BACKENDS.get(connection.vendor, FallbackBackend)()
+
+
+def index_foods(food_ids):
+    food_ids = list(food_ids)
+    if food_ids:
+        with connection.cursor() as cursor:
+            get_backend().index(cursor, food_ids)
+
+
+def unindex_foods(food_ids):
+    food_ids = list(food_ids)
+    if food_ids:
+        with connection.cursor() as cursor:
+            get_backend().unindex(cursor, food_ids)
+
+
+def rebuild_index():
+    with connection.cursor() as cursor:
+        get_backend().rebuild(cursor)
+
+
+def search_food_ids(query, limit=MAX_RESULTS):
+    """Return the ids of foods matching ``query``, best match first."""
+    terms = _terms(query)
+    if not terms:
+        return []
+    with connection.cursor() as cursor:
+        return get_backend().search(cursor, terms, limit)
+
+
+def search_foods(query, queryset=None, limit=MAX_RESULTS):
+    """Return the foods in ``queryset`` matching ``query``, best match first."""
+    ids = search_food_ids(query, limit)
+    if queryset is None:
+        queryset = FoodItem.objects.all()
+    found = queryset.in_bulk(ids)
+    return [found[food_id] for food_id in ids if food_id in found]
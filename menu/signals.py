@@ -0,0 +1,126 @@
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import badges, catalog, events, instrumentation, search, slots
+from .models import (
+    Category, FoodItem,
+    Notification, Order, OrderStatusCounter,
+    Table, TableBooking, TableReview,
+)
+
+
+# ========================= MENU CATALOG =========================
+
+@receiver(post_save, sender=FoodItem)
+@receiver(post_delete, sender=FoodItem)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_menu_catalog(sender, **kwargs):
+    # Same transaction as the change: readers see the new version and the
+    # new rows together.
+    catalog.bump_version()
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def touch_category_foods(sender, instance, **kwargs):
+    # Food cards show the category name, and their fragment cache is keyed
+    # on FoodItem.updated_at. Runs before delete so SET_NULL still finds them.
+    FoodItem.objects.filter(category=instance).update(updated_at=timezone.now())
+
+
+# ========================= MENU SEARCH INDEX =========================
+
+@receiver(post_save, sender=FoodItem)
+def index_food(sender, instance, **kwargs):
+    search.index_foods([instance.pk])
+
+
+@receiver(post_delete, sender=FoodItem)
+def unindex_food(sender, instance, **kwargs):
+    search.unindex_foods([instance.pk])
+
+
+@receiver(post_save, sender=Category)
+def reindex_category_foods(sender, instance, **kwargs):
+    search.index_foods(
+        FoodItem.objects.filter(category=instance).values_list("pk", flat=True)
+    )
+
+
+@receiver(pre_delete, sender=Category)
+def remember_category_foods(sender, instance, **kwargs):
+    # SET_NULL clears the foods' category with a plain UPDATE, so note them
+    # here and reindex them once the category is gone.
+    instance._food_ids = list(
+        FoodItem.objects.filter(category=instance).values_list("pk", flat=True)
+    )
+
+
+@receiver(post_delete, sender=Category)
+def reindex_uncategorised_foods(sender, instance, **kwargs):
+    search.index_foods(getattr(instance, "_food_ids", []))
+
+
+# ========================= ORDER STATUS COUNTERS =========================
+
+@receiver(post_delete, sender=Order)
+def release_order_status_count(sender, instance, **kwargs):
+    # Runs inside the deletion's transaction, including cascades from User.
+    OrderStatusCounter.objects.adjust(instance.order_status, -1)
+
+
+# ========================= LIVE ORDER EVENTS =========================
+
+@receiver(post_save, sender=Order)
+def publish_order_event(sender, instance, **kwargs):
+    transaction.on_commit(
+        lambda: events.publish_order_change(instance.user_id)
+    )
+
+
+# ========================= UNREAD BADGES =========================
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+def invalidate_unread_badges(sender, instance, **kwargs):
+    transaction.on_commit(lambda: badges.invalidate(instance.user_id))
+
+
+# ========================= TABLE RATINGS =========================
+
+@receiver(pre_delete, sender=TableReview)
+def remember_table_rating(sender, instance, **kwargs):
+    # What is stored, not what a stale instance still holds.
+    instance._stored_rating = instance.stored_rating(lock=True)
+
+
+@receiver(post_delete, sender=TableReview)
+def release_table_rating(sender, instance, **kwargs):
+    # Also fires for cascades from Table; the row is removed right after.
+    if instance._stored_rating:
+        Table.objects.shift_rating(*instance._stored_rating, -1)
+
+
+# ========================= TABLE SLOTS =========================
+
+@receiver(post_save, sender=TableBooking)
+@receiver(post_delete, sender=TableBooking)
+def invalidate_table_slots(sender, instance, **kwargs):
+    transaction.on_commit(
+        lambda: slots.invalidate(instance.table_id, instance.date)
+    )
+
+
+# ========================= SQL INSTRUMENTATION =========================
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    # Worker threads under ASGI open their own connections; see
+    # menu/instrumentation.py.
+    instrumentation.install(connection)
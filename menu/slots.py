@@ -0,0 +1,139 @@
+"""
+Table availability: which start times are still bookable for a table on a day.
+
+A booking blocks its table for BOOKING_BUFFER on either side, so two bookings
+on the same table must start at least 30 minutes apart. Windows are built
+from full datetimes rather than a ``time__range`` on the TimeField, so a
+window that crosses midnight checks the neighbouring day as well.
+"""
+from datetime import datetime, time, timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import TableBooking, TableDay
+
+OPENING_TIME = time(10, 0)
+LAST_SLOT_TIME = time(22, 0)
+SLOT_STEP = timedelta(minutes=30)
+BOOKING_BUFFER = timedelta(minutes=30)
+SLOTS_CACHE_TIMEOUT = 60 * 10
+
+
+def day_slots(day):
+    """Every bookable start time on ``day`` as naive datetimes."""
+    slot = datetime.combine(day, OPENING_TIME)
+    last = datetime.combine(day, LAST_SLOT_TIME)
+    slots = []
+    while slot <= last:
+        slots.append(slot)
+        slot += SLOT_STEP
+    return slots
+
+
+def _window_q(start, end):
+    if start.date() == end.date():
+        return Q(date=start.date(), time__range=(start.time(), end.time()))
+    return (
+        Q(date=start.date(), time__gte=start.time())
+        | Q(date=end.date(), time__lte=end.time())
+    )
+
+
+def _blocking_window(start):
+    # Bookings strictly closer than BOOKING_BUFFER conflict; TimeField
+    # values are stored to the second, so shave one off each side.
+    edge = BOOKING_BUFFER - timedelta(seconds=1)
+    return start - edge, start + edge
+
+
+def has_conflict(table_id, start):
+    return TableBooking.objects.filter(
+        _window_q(*_blocking_window(start)),
+        table_id=table_id,
+    ).exists()
+
+
+class SlotTaken(Exception):
+    pass
+
+
+def reserve(user, table_id, start):
+    """
+    Book ``table_id`` at ``start`` for ``user`` and return the booking, or
+    raise SlotTaken if another booking is within BOOKING_BUFFER.
+
+    The check and the insert run while holding the TableDay rows for every
+    day the buffer window touches, so two requests for the same table and
+    day cannot both pass the check. The rows are locked with an UPDATE
+    rather than SELECT ... FOR UPDATE, which SQLite ignores; there the
+    UPDATE takes the database write lock instead.
+    """
+    days = sorted({edge.date() for edge in _blocking_window(start)})
+
+    # Created in their own statement so no lock is held across the UPDATE.
+    TableDay.objects.bulk_create(
+        [TableDay(table_id=table_id, date=day) for day in days],
+        ignore_conflicts=True,
+    )
+    with transaction.atomic():
+        TableDay.objects.filter(table_id=table_id, date__in=days).update(
+            version=F("version") + 1
+        )
+        if has_conflict(table_id, start):
+            raise SlotTaken
+        return TableBooking.objects.create(
+            user=user,
+            table_id=table_id,
+            date=start.date(),
+            time=start.time(),
+        )
+
+
+def _cache_key(table_id, day):
+    return f"menu:slots:{table_id}:{day.isoformat()}"
+
+
+def _compute_free_slots(table_id, day):
+    slots = day_slots(day)
+    window_start, _ = _blocking_window(slots[0])
+    _, window_end = _blocking_window(slots[-1])
+
+    booked = [
+        datetime.combine(d, t)
+        for d, t in TableBooking.objects.filter(
+            _window_q(window_start, window_end),
+            table_id=table_id,
+        ).values_list("date", "time")
+    ]
+    return [
+        slot for slot in slots
+        if all(abs(slot - taken) >= BOOKING_BUFFER for taken in booked)
+    ]
+
+
+def free_slots(table_id, day):
+    """
+    Free start times for ``table_id`` on ``day`` that are not in the past.
+
+    The day's free set is computed with one query and cached until a
+    booking on that table touches the day (see menu/signals.py).
+    """
+    key = _cache_key(table_id, day)
+    slots = cache.get(key)
+    if slots is None:
+        slots = _compute_free_slots(table_id, day)
+        cache.set(key, slots, SLOTS_CACHE_TIMEOUT)
+
+    current = timezone.localtime().replace(tzinfo=None)
+    return [slot for slot in slots if slot > current]
+
+
+def invalidate(table_id, day):
+    # A booking's buffer can reach into the previous or next day.
+    cache.delete_many([
+        _cache_key(table_id, day + timedelta(days=offset))
+        for offset in (-1, 0, 1)
+    ])
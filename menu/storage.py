@@ -0,0 +1,76 @@
+"""
+Content-addressed media storage.
+
+Uploaded files are named after the SHA-256 of their bytes, e.g.
+``food_images/3f1c...e9.jpg``. Uploading the same photo twice stores it once
+and yields the same URL, and a URL can never point at different bytes. That
+lets browsers and CDNs cache media forever (see ``serve_media``).
+"""
+import hashlib
+import posixpath
+import re
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.cache import patch_cache_control
+from django.views.static import serve
+
+HASH_LENGTH = 32
+# Content-addressed originals and the variants derived from them.
+IMMUTABLE_NAME = re.compile(r"(^|/)[0-9a-f]{%d}(-[a-z]+)?\.\w+$" % HASH_LENGTH)
+
+
+def content_hash(content):
+    digest = hashlib.sha256()
+    if hasattr(content, "seek"):
+        content.seek(0)
+    for chunk in content.chunks():
+        digest.update(chunk)
+    if hasattr(content, "seek"):
+        content.seek(0)
+    return digest.hexdigest()[:HASH_LENGTH]
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def hashed_name(self, name, content):
+        directory, filename = posixpath.split(name)
+        extension = posixpath.splitext(filename)[1].lower()
+        return posixpath.join(directory, content_hash(content) + extension)
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+
+        name = self.hashed_name(name, content)
+        if self.exists(name):
+            # Same bytes are already stored under this name.
+            return name
+        saved = super().save(name, content, max_length=max_length)
+        if saved != name:
+            # A concurrent upload of the same bytes created ``name`` after
+            # the check above, so this copy got a suffixed name: drop it
+            # and share theirs.
+            self.delete(saved)
+            return name
+        return saved
+
+    def save_exact(self, name, content):
+        """Store under ``name`` as given, for files derived from a hashed original."""
+        return super().save(name, content)
+
+
+def serve_media(request, path, document_root=None):
+    """
+    ``django.views.static.serve`` with cache headers, for DEBUG and
+    settings.SERVE_MEDIA only; production media belongs on the web server
+    or a CDN.
+    """
+    response = serve(request, path, document_root=document_root or settings.MEDIA_ROOT)
+    if IMMUTABLE_NAME.search(path):
+        patch_cache_control(response, public=True, max_age=60 * 60 * 24 * 365, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=60 * 60)
+    return response
@@ -0,0 +1,54 @@
+from django import template
+from django.utils.html import format_html
+
+from menu.images import VARIANTS, has_variants, variant_name
+
+register = template.Library()
+
+DEFAULT_SIZES = "(max-width: 576px) 100vw, (max-width: 992px) 50vw, 33vw"
+
+
+def _srcset(field_file, ext):
+    storage = field_file.storage
+    return ", ".join(
+        f"{storage.url(variant_name(field_file.name, variant, ext))} {width}w"
+        for variant, width in VARIANTS.items()
+    )
+
+
+@register.simple_tag
+def responsive_image(field_file, alt="", css_class="", style="", sizes=DEFAULT_SIZES, size="card"):
+    """
+    Render an ImageField as a lazy-loaded ``<picture>`` built from its
+    resized variants, with a blurred placeholder behind it.
+
+        {% responsive_image food.image alt=food.name css_class="food-image" %}
+
+    Images uploaded before variants existed fall back to a plain lazy ``<img>``
+    until `manage.py generate_image_variants` has been run.
+    """
+    if not field_file:
+        return ""
+
+    if not has_variants(field_file):
+        return format_html(
+            '<img src="{}" alt="{}" class="{}" style="{}" loading="lazy" decoding="async">',
+            field_file.url, alt, css_class, style,
+        )
+
+    storage = field_file.storage
+    return format_html(
+        '<picture style="display:block;width:100%;height:100%;">'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" alt="{}" class="{}" loading="lazy" decoding="async" '
+        'style="background:url({}) center/cover no-repeat;{}"></picture>',
+        _srcset(field_file, "webp"),
+        sizes,
+        storage.url(variant_name(field_file.name, size, "jpg")),
+        _srcset(field_file, "jpg"),
+        sizes,
+        alt,
+        css_class,
+        storage.url(variant_name(field_file.name, "placeholder", "jpg")),
+        style,
+    )
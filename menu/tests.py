@@ -1,3 +1,926 @@
-from django.test import TestCase
+import datetime
+import io
+import json
+import logging
+import os
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DatabaseError, connection, transaction
+from django.template import Context, Template
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from . import badges, catalog, order_flow, order_numbers, orders, outbox, search, slots
+from .forms import FoodItemForm
+from .images import FORMATS, VARIANTS, has_variants, variant_name
+from .instrumentation import fingerprint, record_queries
+from .management.commands.benchmark_views import HOT_VIEWS
+from .management.commands._stats import percentile
+from .management.commands.stress_test import booking_violations
+from .models import (
+    Cart, CartItem, Category, FoodItem, Notification, NotificationOutbox,
+    Order, OrderItem, OrderStatusCounter, Table, TableBooking, TableDay, TableReview,
+)
+from .storage import ContentAddressedStorage
+from .urls import QUERY_BUDGETS, urlpatterns
+
+TEST_SETTINGS = {
+    "CACHES": {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    # The manifest only exists after collectstatic.
+    "STORAGES": {
+        "default": {"BACKEND": "django.core.files.storage.InMemoryStorage"},
+        "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    },
+}
+
+
+# Cold requests in these tests go over their budgets by design; keep the
+# middleware's warnings out of the test output (assertLogs still sees them).
+_sql_log = logging.getLogger("menu.sql")
+_sql_log_level = _sql_log.level
+
+
+def setUpModule():
+    _sql_log.setLevel(logging.CRITICAL)
+
+
+def tearDownModule():
+    _sql_log.setLevel(_sql_log_level)
+
+
+class FingerprintTests(SimpleTestCase):
+    def test_in_lists_of_any_length_match(self):
+        self.assertEqual(
+            fingerprint('SELECT * FROM "t" WHERE "id" IN (%s, %s, %s)'),
+            fingerprint('SELECT * FROM "t" WHERE "id" IN (%s)'),
+        )
+
+    def test_literals_are_ignored(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE a = 'x' LIMIT 21"),
+            fingerprint("SELECT * FROM t WHERE a = 'y''z' LIMIT 1"),
+        )
+
+
+class BookingViolationTests(SimpleTestCase):
+    def test_starts_inside_the_buffer_are_flagged(self):
+        at = datetime.datetime(2030, 1, 1, 19)
+        times = [at + datetime.timedelta(minutes=m) for m in (30, 0, 50, 120)]
+        self.assertEqual(booking_violations(times), [(times[0], times[2])])
+
+    def test_back_to_back_slots_are_fine(self):
+        at = datetime.datetime(2030, 1, 1, 19)
+        self.assertEqual(booking_violations([at, at + datetime.timedelta(minutes=30)]), [])
+
+
+class PercentileTests(SimpleTestCase):
+    def test_nearest_rank_of_unsorted_samples(self):
+        samples = list(range(100, 0, -1))
+        self.assertEqual(percentile(samples, 50), 50)
+        self.assertEqual(percentile(samples, 99), 99)
+        self.assertEqual(percentile(samples, 100), 100)
+        self.assertEqual(percentile([7.5], 90), 7.5)
+
+    def test_no_samples(self):
+        self.assertEqual(percentile([], 99), 0.0)
+
+
+class OrderNumberTests(SimpleTestCase):
+    def assertUniqueAndOrdered(self, numbers):
+        self.assertEqual(len(set(numbers)), len(numbers))
+        self.assertEqual(numbers, sorted(numbers))
+        for number in numbers:
+            self.assertRegex(number, rf"^{order_numbers.PREFIX}[0-9A-HJKMNP-TV-Z]{{{order_numbers.WIDTH}}}$")
+
+    def test_numbers_are_unique_and_sort_by_creation(self):
+        generate = order_numbers.TimeOrderedGenerator(node_id=3)
+        self.assertUniqueAndOrdered([generate() for _ in range(5000)])
+
+    def test_a_busy_millisecond_borrows_the_next_one(self):
+        generate = order_numbers.TimeOrderedGenerator()
+        frozen = (order_numbers.ORDER_EPOCH_MS + 1000) * 1_000_000
+        with mock.patch("menu.order_numbers.time.time_ns", return_value=frozen):
+            numbers = [generate() for _ in range(5000)]
+        self.assertUniqueAndOrdered(numbers)
+
+    def test_a_clock_stepping_back_never_reorders_numbers(self):
+        generate = order_numbers.TimeOrderedGenerator()
+        start = (order_numbers.ORDER_EPOCH_MS + 1000) * 1_000_000
+        ticks = [start + ms * 1_000_000 for ms in (5, 6, 2, 1, 7)]
+        with mock.patch("menu.order_numbers.time.time_ns", side_effect=ticks):
+            numbers = [generate() for _ in ticks]
+        self.assertUniqueAndOrdered(numbers)
+
+    def test_a_missing_node_id_fails_loudly(self):
+        with override_settings(ORDER_NUMBER_NODE_ID=None):
+            with self.assertRaises(ImproperlyConfigured):
+                order_numbers.TimeOrderedGenerator()
+            self.assertEqual([e.id for e in order_numbers.check_node_id(None)], ["menu.E001"])
+
+    def test_node_id_from_the_environment(self):
+        with override_settings(ORDER_NUMBER_NODE_ID="7"):
+            self.assertEqual(order_numbers.TimeOrderedGenerator().node_id, 7)
+            self.assertEqual(order_numbers.check_node_id(None), [])
+
+    def test_node_id_out_of_range_is_refused(self):
+        with self.assertRaises(ValueError):
+            order_numbers.TimeOrderedGenerator(node_id=1 << order_numbers.NODE_BITS)
+
+
+@override_settings(**TEST_SETTINGS)
+class CatalogVersionTests(TestCase):
+    def test_every_bump_counts_and_survives_cache_eviction(self):
+        start = catalog.get_version()
+        catalog.bump_version()
+        catalog.bump_version()
+        cache.clear()
+        self.assertEqual(catalog.get_version(), start + 2)
+
+    def test_menu_changes_bump_the_version_in_their_transaction(self):
+        start = catalog.get_version()
+        category = Category.objects.create(name="Soups")
+        self.assertGreater(catalog.get_version(), start)
+
+        cached = catalog.get_catalog()
+        FoodItem.objects.create(name="Rasam", price=60, description="Hot", category=category)
+        self.assertNotEqual(catalog.get_catalog(), cached)
+
+
+def image_bytes(fmt="JPEG", mode="RGB", size=(64, 48)):
+    buffer = io.BytesIO()
+    Image.new(mode, size, (200, 80, 20, 128)[:len(mode)]).save(buffer, fmt)
+    return buffer.getvalue()
+
+
+class MediaRootMixin:
+    """Runs each test against ContentAddressedStorage in a scratch MEDIA_ROOT."""
+
+    def setUp(self):
+        super().setUp()
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.media_root = media.name
+        overrides = override_settings(
+            MEDIA_ROOT=self.media_root,
+            STORAGES={
+                **TEST_SETTINGS["STORAGES"],
+                "default": {"BACKEND": "menu.storage.ContentAddressedStorage"},
+            },
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.storage = ContentAddressedStorage()
+
+    def write(self, name, content):
+        path = os.path.join(self.media_root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as fh:
+            fh.write(content)
+
+    def files(self, folder):
+        return sorted(os.listdir(os.path.join(self.media_root, folder)))
+
+
+@override_settings(**TEST_SETTINGS)
+class ContentAddressedStorageTests(MediaRootMixin, TestCase):
+    def test_same_bytes_share_one_file(self):
+        content = image_bytes()
+        first = self.storage.save("food_images/a.jpg", ContentFile(content))
+        second = self.storage.save("food_images/b.JPG", ContentFile(content))
+        self.assertEqual(first, second)
+        self.assertRegex(first, r"^food_images/[0-9a-f]{32}\.jpg$")
+        self.assertEqual(self.files("food_images"), [os.path.basename(first)])
+
+    def test_losing_an_upload_race_returns_the_winners_name(self):
+        content = image_bytes()
+        winner = self.storage.save("food_images/a.jpg", ContentFile(content))
+        # The loser checked before the winner's file appeared.
+        with mock.patch.object(ContentAddressedStorage, "exists", side_effect=[False, True, False]):
+            loser = self.storage.save("food_images/a.jpg", ContentFile(content))
+        self.assertEqual(loser, winner)
+        self.assertEqual(self.files("food_images"), [os.path.basename(winner)])
+
+
+@override_settings(**TEST_SETTINGS)
+class DedupeMediaTests(MediaRootMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        content = image_bytes()
+        self.write("food_images/paneer.jpg", content)
+        self.write("food_images/paneer-copy.jpg", content)
+        self.write("food_images/forgotten.png", image_bytes("PNG"))
+        category = Category.objects.create(name="Mains")
+        self.foods = [
+            FoodItem.objects.create(
+                name=f"Dish {i}", price=100, description="Tasty", category=category, image=name,
+            )
+            for i, name in enumerate(["food_images/paneer.jpg", "food_images/paneer-copy.jpg"])
+        ]
+        self.target = self.storage.hashed_name("food_images/paneer.jpg", ContentFile(content))
+
+    def images(self):
+        return sorted(FoodItem.objects.values_list("image", flat=True))
+
+    def test_dry_run_changes_nothing(self):
+        out = io.StringIO()
+        call_command("dedupe_media", dry_run=True, delete_orphans=True, stdout=out)
+        self.assertIn("Would rewrite 2 row(s); removed 3 file(s).", out.getvalue())
+        self.assertEqual(self.images(), ["food_images/paneer-copy.jpg", "food_images/paneer.jpg"])
+        self.assertEqual(self.files("food_images"), ["forgotten.png", "paneer-copy.jpg", "paneer.jpg"])
+
+    def test_duplicates_collapse_onto_one_hashed_file(self):
+        out = io.StringIO()
+        call_command("dedupe_media", stdout=out)
+        self.assertIn("Rewrote 2 row(s); removed 2 file(s).", out.getvalue())
+        self.assertEqual(self.images(), [self.target, self.target])
+        self.assertEqual(
+            self.files("food_images"),
+            sorted(["forgotten.png", os.path.basename(self.target), "variants"]),
+        )
+        self.assertTrue(has_variants(FoodItem.objects.first().image))
+
+    def test_delete_orphans_removes_unreferenced_uploads(self):
+        call_command("dedupe_media", delete_orphans=True, stdout=io.StringIO())
+        self.assertEqual(self.files("food_images"), [os.path.basename(self.target), "variants"])
+
+
+@override_settings(**TEST_SETTINGS)
+class ImageVariantTests(MediaRootMixin, TestCase):
+    def upload(self):
+        category = Category.objects.create(name="Mains")
+        form = FoodItemForm(
+            data={"name": "Lassi", "category": category.pk, "price": "80", "description": "Sweet", "available": True},
+            files={"image": SimpleUploadedFile("lassi.png", image_bytes("PNG", "RGBA", (1200, 900)), "image/png")},
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        return form.save()
+
+    def test_an_rgba_upload_gets_every_variant_and_a_placeholder(self):
+        food = self.upload()
+
+        for variant, width in VARIANTS.items():
+            for ext in FORMATS:
+                name = variant_name(food.image.name, variant, ext)
+                self.assertTrue(self.storage.exists(name), name)
+                with self.storage.open(name) as fh, Image.open(fh) as image:
+                    self.assertEqual(image.mode, "RGB")
+                    self.assertEqual(image.width, width)
+        self.assertTrue(self.storage.exists(variant_name(food.image.name, "placeholder", "jpg")))
+        self.assertTrue(has_variants(food.image))
+
+    def test_responsive_image_emits_srcset_for_the_variants(self):
+        food = self.upload()
+
+        html = Template("{% load menu_images %}{% responsive_image food.image alt=food.name %}").render(
+            Context({"food": food})
+        )
+
+        self.assertIn("<picture", html)
+        self.assertIn('type="image/webp" srcset="', html)
+        self.assertIn(self.storage.url(variant_name(food.image.name, "card", "webp")) + " 480w", html)
+        self.assertIn(self.storage.url(variant_name(food.image.name, "placeholder", "jpg")), html)
+
+
+@override_settings(**TEST_SETTINGS)
+class ReserveTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("alice")
+        cls.table = Table.objects.create(table_number=1, seats=4)
+
+    def test_bookings_inside_the_buffer_are_refused(self):
+        start = datetime.datetime(2030, 1, 1, 19)
+        slots.reserve(self.user, self.table.id, start)
+        with self.assertRaises(slots.SlotTaken):
+            slots.reserve(self.user, self.table.id, start + datetime.timedelta(minutes=10))
+        slots.reserve(self.user, self.table.id, start + datetime.timedelta(minutes=30))
+
+        self.assertEqual(TableBooking.objects.filter(table=self.table).count(), 2)
+        # The refused attempt rolled its lock update back.
+        self.assertEqual(TableDay.objects.get(table=self.table, date=start.date()).version, 2)
+
+    def test_window_across_midnight_locks_both_days(self):
+        start = datetime.datetime(2030, 1, 1, 23, 50)
+        slots.reserve(self.user, self.table.id, start)
+
+        self.assertEqual(
+            list(TableDay.objects.filter(table=self.table).values_list("date", flat=True).order_by("date")),
+            [datetime.date(2030, 1, 1), datetime.date(2030, 1, 2)],
+        )
+        with self.assertRaises(slots.SlotTaken):
+            slots.reserve(self.user, self.table.id, datetime.datetime(2030, 1, 2, 0, 10))
+
+
+@override_settings(**TEST_SETTINGS)
+class OrderStatusCounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("alice")
+
+    def setUp(self):
+        self.order = Order.objects.create(
+            user=self.user, order_number="ORDCOUNT", total_amount=100,
+            final_amount=150, payment_method="UPI",
+        )
+
+    def assertCounts(self, **expected):
+        counts = OrderStatusCounter.objects.as_dict()
+        self.assertEqual({status: counts[status] for status in expected}, expected)
+        self.assertEqual(OrderStatusCounter.objects.rebuild(commit=False), {})
+
+    def test_save_moves_one_order_between_statuses(self):
+        self.order.order_status = "Confirmed"
+        self.order.save()
+        self.assertCounts(Pending=0, Confirmed=1)
+
+    def test_save_after_refresh_from_db(self):
+        Order.objects.filter(pk=self.order.pk).update(order_status="Ready")
+        OrderStatusCounter.objects.rebuild()
+        self.order.refresh_from_db()
+        self.order.order_status = "Completed"
+        self.order.save()
+        self.assertCounts(Pending=0, Ready=0, Completed=1)
+
+    def test_save_of_a_deferred_load(self):
+        order = Order.objects.only("id").get(pk=self.order.pk)
+        order.order_status = "Cancelled"
+        order.save()
+        self.assertCounts(Pending=0, Cancelled=1)
+
+        order = Order.objects.only("seen_by_user").get(pk=self.order.pk)
+        order.seen_by_user = True
+        order.save()
+        self.assertCounts(Pending=0, Cancelled=1)
+
+    def test_two_stale_copies_of_one_order(self):
+        first = Order.objects.get(pk=self.order.pk)
+        second = Order.objects.get(pk=self.order.pk)
+        first.order_status = "Confirmed"
+        first.save()
+        second.order_status = "Cancelled"
+        second.save()
+        self.assertCounts(Pending=0, Confirmed=0, Cancelled=1)
+
+    def test_update_fields_without_the_status(self):
+        self.order.order_status = "Ready"
+        self.order.save(update_fields=["seen_by_user"])
+        self.assertCounts(Pending=1, Ready=0)
+
+
+@override_settings(**TEST_SETTINGS)
+class TableRatingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("alice")
+        cls.first = Table.objects.create(table_number="A", seats=2)
+        cls.second = Table.objects.create(table_number="B", seats=2)
+
+    def setUp(self):
+        self.review = TableReview.objects.create(
+            table=self.first, user=self.user, rating=4, comment="Good",
+        )
+
+    def assertRatings(self, **expected):
+        stored = {
+            table.table_number: (table.rating_sum, table.rating_count)
+            for table in Table.objects.all()
+        }
+        self.assertEqual(stored, expected)
+        self.assertEqual(Table.objects.rebuild_ratings(commit=False), {})
+
+    def test_moving_a_review_to_another_table(self):
+        self.review.table = self.second
+        self.review.rating = 5
+        self.review.save()
+        self.assertRatings(A=(0, 0), B=(5, 1))
+
+    def test_editing_a_deferred_load(self):
+        review = TableReview.objects.only("id").get(pk=self.review.pk)
+        review.rating = 2
+        review.save()
+        self.assertRatings(A=(2, 1), B=(0, 0))
+
+        review = TableReview.objects.only("comment").get(pk=self.review.pk)
+        review.comment = "Fine"
+        review.save()
+        self.assertRatings(A=(2, 1), B=(0, 0))
+
+    def test_two_stale_copies_then_delete(self):
+        first = TableReview.objects.get(pk=self.review.pk)
+        second = TableReview.objects.get(pk=self.review.pk)
+        first.rating = 1
+        first.save()
+        second.rating = 3
+        second.save()
+        self.assertRatings(A=(3, 1), B=(0, 0))
+
+        first.delete()
+        self.assertRatings(A=(0, 0), B=(0, 0))
+
+    def test_rebuild_repairs_drift(self):
+        Table.objects.filter(pk=self.first.pk).update(rating_sum=9, rating_count=3)
+        out = io.StringIO()
+        with self.assertRaises(SystemExit):
+            call_command("rebuild_table_ratings", check=True, stdout=out, stderr=io.StringIO())
+        self.assertIn("Table A: stored sum/count=9/3 actual=4/1", out.getvalue())
+
+        call_command("rebuild_table_ratings", stdout=io.StringIO())
+        self.assertRatings(A=(4, 1), B=(0, 0))
+
+
+@override_settings(**TEST_SETTINGS)
+class PlaceOrderTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="Mains")
+        cls.foods = FoodItem.objects.bulk_create([
+            FoodItem(name=f"Dish {i}", price=10 + i, description="Tasty", category=category)
+            for i in range(50)
+        ])
+
+    def cart_for(self, username, foods):
+        user = User.objects.create_user(username)
+        cart = Cart.objects.create(user=user)
+        CartItem.objects.bulk_create([CartItem(cart=cart, food=food, quantity=2) for food in foods])
+        return user
+
+    def test_a_failure_leaves_no_order_and_the_cart_intact(self):
+        user = self.cart_for("alice", self.foods[:3])
+        with mock.patch.object(OrderItem.objects, "bulk_create", side_effect=DatabaseError("disk full")):
+            with self.assertRaises(DatabaseError):
+                orders.place_order(user, "UPI")
+
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(CartItem.objects.filter(cart__user=user).count(), 3)
+        self.assertEqual(OrderStatusCounter.objects.rebuild(commit=False), {})
+
+    def test_query_count_does_not_grow_with_the_cart(self):
+        counts = {}
+        for size in (1, 50):
+            user = self.cart_for(f"user{size}", self.foods[:size])
+            with record_queries() as stats:
+                order = orders.place_order(user, "UPI")
+            counts[size] = stats.count
+            self.assertEqual(order.orderitem_set.count(), size)
+            self.assertFalse(CartItem.objects.filter(cart__user=user).exists())
+        self.assertGreater(counts[1], 0)
+        self.assertEqual(counts[1], counts[50])
+
+
+@override_settings(**TEST_SETTINGS)
+class OrderFlowTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("alice")
+
+    def order(self, number, status="Pending"):
+        return Order.objects.create(
+            user=self.user, order_number=number, order_status=status,
+            total_amount=100, final_amount=150, payment_method="UPI",
+        )
+
+    def test_losing_the_race_returns_false_and_queues_nothing(self):
+        order = self.order("ORDFLOW0")
+        # Another terminal cancels the order this one still sees as Pending.
+        self.assertTrue(order_flow.transition(order.id, "cancel", expected="Pending"))
+        self.assertFalse(order_flow.transition(order.id, "confirm", expected="Pending"))
+
+        order.refresh_from_db()
+        self.assertEqual(order.order_status, "Cancelled")
+        self.assertEqual(
+            list(NotificationOutbox.objects.values_list("title", flat=True)),
+            [order_flow.TRANSITIONS["cancel"]["title"]],
+        )
+        self.assertEqual(OrderStatusCounter.objects.rebuild(commit=False), {})
+
+    def test_bulk_transition_moves_only_orders_in_a_source_state(self):
+        pending, confirmed, ready = (
+            self.order(f"ORDFLOW{i}", status)
+            for i, status in enumerate(["Pending", "Confirmed", "Ready"])
+        )
+        moved = order_flow.bulk_transition("cancel", [pending.id, confirmed.id, ready.id])
+
+        self.assertCountEqual(moved, [pending.id, confirmed.id])
+        self.assertEqual(
+            dict(Order.objects.values_list("id", "order_status")),
+            {pending.id: "Cancelled", confirmed.id: "Cancelled", ready.id: "Ready"},
+        )
+        self.assertCountEqual(
+            NotificationOutbox.objects.values_list("order_id", flat=True),
+            [pending.id, confirmed.id],
+        )
+        self.assertEqual(OrderStatusCounter.objects.rebuild(commit=False), {})
+        self.assertEqual(order_flow.bulk_transition("cancel", [ready.id]), [])
+
+
+@override_settings(**TEST_SETTINGS)
+class OutboxTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = User.objects.create_user("alice")
+        cls.bob = User.objects.create_user("bob")
+
+    def setUp(self):
+        cache.clear()
+        for i in range(5):
+            outbox.enqueue(
+                (self.alice if i % 2 else self.bob).id, f"Title {i}", f"Message {i}",
+            )
+
+    def test_drain_delivers_the_oldest_batch_and_refreshes_badges(self):
+        self.assertEqual(badges.get_unread_counts(self.alice.id)["notifications"], 0)
+        self.assertEqual(badges.get_unread_counts(self.bob.id)["notifications"], 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(outbox.drain(batch_size=3), 3)
+
+        self.assertEqual(
+            list(Notification.objects.order_by("id").values_list("user_id", "title", "message", "notification_type")),
+            [
+                (self.bob.id, "Title 0", "Message 0", "order"),
+                (self.alice.id, "Title 1", "Message 1", "order"),
+                (self.bob.id, "Title 2", "Message 2", "order"),
+            ],
+        )
+        self.assertEqual(
+            list(NotificationOutbox.objects.order_by("id").values_list("title", flat=True)),
+            ["Title 3", "Title 4"],
+        )
+        # Both users' cached badges were dropped and recount the new rows.
+        self.assertEqual(badges.get_unread_counts(self.alice.id)["notifications"], 1)
+        self.assertEqual(badges.get_unread_counts(self.bob.id)["notifications"], 2)
+
+    def test_worker_drains_everything_once(self):
+        out = io.StringIO()
+        call_command("process_notification_outbox", once=True, batch_size=2, stdout=out)
+        self.assertIn("Delivered 5 notification(s).", out.getvalue())
+        self.assertEqual(Notification.objects.count(), 5)
+        self.assertFalse(NotificationOutbox.objects.exists())
+        self.assertEqual(outbox.drain(), 0)
+
+
+@override_settings(**TEST_SETTINGS)
+class SearchIndexTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name="Starters")
+        cls.food = FoodItem.objects.create(
+            name="Paneer Tikka", price=180, description="Grilled cottage cheese",
+            category=cls.category,
+        )
+
+    def test_renaming_a_food_reindexes_it(self):
+        self.assertEqual(search.search_food_ids("paneer"), [self.food.id])
+        self.food.name = "Butter Chicken"
+        self.food.save()
+        self.assertEqual(search.search_food_ids("paneer"), [])
+        self.assertEqual(search.search_food_ids("butt"), [self.food.id])
+
+    def test_renaming_a_category_reindexes_its_foods(self):
+        self.category.name = "Grills"
+        self.category.save()
+        self.assertEqual(search.search_food_ids("starters"), [])
+        self.assertEqual(search.search_food_ids("grills"), [self.food.id])
+
+    def test_deleting_a_food_unindexes_it(self):
+        food_id = self.food.id
+        self.food.delete()
+        self.assertEqual(search.search_food_ids("paneer"), [])
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {search.INDEX_TABLE} WHERE rowid = %s", [food_id])
+            self.assertEqual(cursor.fetchone()[0], 0)
+
+    def test_admin_search_says_when_results_are_capped(self):
+        self.client.force_login(User.objects.create_superuser("root"))
+        url = reverse("admin:menu_fooditem_changelist")
+        with mock.patch("menu.admin.ADMIN_SEARCH_LIMIT", 1):
+            self.assertContains(self.client.get(url, {"q": "paneer"}), "best 1 matches only")
+            self.assertNotContains(self.client.get(url, {"q": "nothing"}), "matches only")
+
+    def test_databases_without_an_index_fall_back_to_icontains(self):
+        with mock.patch.dict(search.BACKENDS, clear=True):
+            self.food.name = "Paneer Butter Masala"
+            self.food.save()
+            other = FoodItem.objects.create(
+                name="Naan", price=40, description="Goes with paneer", category=self.category,
+            )
+            self.assertEqual(search.search_food_ids("paneer"), [self.food.id, other.id])
+            self.assertEqual(search.search_food_ids("paneer butter"), [self.food.id])
+
+
+@override_settings(**TEST_SETTINGS)
+class QueryBudgetTests(TestCase):
+    """
+    Every URL name in menu/urls.py runs against a few rows of each kind, so
+    a query per row (N+1) blows its budget instead of hiding in a fixture
+    of one.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = User.objects.create_user("alice", password="pw", first_name="Alice")
+        cls.staff = User.objects.create_user("staff", password="pw", is_staff=True)
+        cls.other = other = User.objects.create_user("bob", password="pw")
+
+        mains = Category.objects.create(name="Mains")
+        drinks = Category.objects.create(name="Drinks")
+        cls.foods = [
+            FoodItem.objects.create(
+                name=f"Food {i}", price=100 + i, description="Tasty",
+                category=mains if i % 2 else drinks,
+            )
+            for i in range(6)
+        ]
+
+        cart = Cart.objects.create(user=cls.customer)
+        cls.cart_items = [
+            CartItem.objects.create(cart=cart, food=food, quantity=2)
+            for food in cls.foods[:3]
+        ]
+
+        cls.orders = {}
+        for i, status in enumerate(["Pending", "Confirmed", "Ready", "Completed"]):
+            order = Order.objects.create(
+                user=cls.customer, order_number=f"ORDTEST{i}", order_status=status,
+                total_amount=300, final_amount=300, payment_method="UPI",
+            )
+            for food in cls.foods[:3]:
+                OrderItem.objects.create(order=order, food=food, quantity=1, price=food.price, subtotal=food.price)
+            Notification.objects.create(
+                user=cls.customer, notification_type="order",
+                title="Order update", message="Update", order=order,
+            )
+            cls.orders[status] = order
+
+        cls.tables = [Table.objects.create(table_number=n, seats=4) for n in (1, 2, 3)]
+        today = timezone.localdate()
+        cls.bookings = [
+            TableBooking.objects.create(
+                user=cls.customer, table=table,
+                date=today + datetime.timedelta(days=1 + n), time=datetime.time(19),
+            )
+            for n, table in enumerate(cls.tables)
+        ]
+        for table in cls.tables:
+            TableReview.objects.create(user=other, table=table, rating=4, comment="Nice")
+
+        cls.notification = Notification.objects.filter(user=cls.customer).first()
+
+    def setUp(self):
+        cache.clear()
+
+    def scenarios(self):
+        """(url name, method) -> (who, url args, data, session)."""
+        orders = self.orders
+        tomorrow = (timezone.localdate() + datetime.timedelta(days=1)).isoformat()
+        booking = {"table": self.tables[0].id, "date": tomorrow, "time": "12:00"}
+        return {
+            ("home", "GET"): ("customer", (), None, None),
+            ("register", "GET"): (None, (), None, None),
+            ("login", "GET"): (None, (), None, None),
+            ("logout", "POST"): ("customer", (), None, None),
+            ("admin_login", "GET"): (None, (), None, None),
+            ("book_table", "GET"): ("customer", (), None, None),
+            ("book_table", "POST"): ("customer", (), booking, None),
+            ("booking_success", "GET"): ("customer", (self.bookings[0].id,), None, None),
+            ("order_food", "GET"): ("customer", (), None, None),
+            ("add_to_cart", "GET"): ("customer", (self.foods[0].id,), None, None),
+            ("view_cart", "GET"): ("customer", (), None, None),
+            ("update_cart", "POST"): ("customer", (self.cart_items[0].id,), {"quantity": 3}, None),
+            ("remove_from_cart", "POST"): ("customer", (self.cart_items[0].id,), None, None),
+            ("checkout", "GET"): ("customer", (), None, None),
+            ("process_payment", "POST"): ("customer", (), {"payment_method": "UPI"}, None),
+            ("order_success", "GET"): ("customer", (orders["Pending"].id,), None, None),
+            ("my_orders", "GET"): ("customer", (), None, None),
+            ("order_events", "GET"): ("customer", (), None, None),
+            ("admin_dashboard", "GET"): ("staff", (), None, None),
+            ("add_food_item", "GET"): ("staff", (), None, None),
+            ("edit_food_item", "GET"): ("staff", (self.foods[0].id,), None, None),
+            ("delete_food_item", "GET"): ("staff", (self.foods[5].id,), None, None),
+            ("admin_food_list", "GET"): ("staff", (), None, None),
+            ("admin_orders", "GET"): ("staff", (), None, None),
+            ("bulk_order_transition", "POST"): (
+                "staff", (),
+                {"action": "cancel", "order_ids": [orders["Pending"].id, orders["Confirmed"].id]},
+                None,
+            ),
+            ("confirm_order", "POST"): ("staff", (orders["Pending"].id,), None, None),
+            ("mark_order_ready", "POST"): ("staff", (orders["Confirmed"].id,), None, None),
+            ("complete_order", "POST"): ("staff", (orders["Ready"].id,), None, None),
+            ("cancel_order", "POST"): ("staff", (orders["Pending"].id,), None, None),
+            ("notifications", "GET"): ("customer", (), None, None),
+            ("mark_notification_read", "POST"): ("customer", (self.notification.id,), None, None),
+            ("forgot_password", "GET"): (None, (), None, None),
+            ("set_new_password", "GET"): (None, (), None, {"reset_user_id": self.customer.id}),
+            ("admin_tables", "GET"): ("staff", (), None, None),
+            ("add_table", "GET"): ("staff", (), None, None),
+            ("edit_table", "GET"): ("staff", (self.tables[0].id,), None, None),
+            ("add_table_review", "GET"): ("customer", (self.tables[0].id,), None, None),
+            ("my_bookings", "GET"): ("customer", (), None, None),
+            ("cancel_booking", "POST"): ("customer", (self.bookings[0].id,), None, None),
+            ("table_detail", "GET"): ("customer", (self.tables[0].id,), None, None),
+            ("table_detail", "POST"): ("customer", (self.tables[0].id,), booking, None),
+            ("table_slots", "GET"): ("customer", (self.tables[0].id,), {"date": tomorrow}, None),
+        }
+
+    def measure(self, key, who, args, data, session, warm=True):
+        """
+        Send the scenario's request and return (response, QueryStats). The
+        cache starts empty; with ``warm`` an untimed identical request
+        fills it first, since budgets describe the steady state.
+        """
+        name, method = key
+        url = reverse(name, args=args)
+        cache.clear()
+        for _ in range(2 if warm else 1):
+            # A fresh client each time: a warm-up logout must not log the
+            # measured request out.
+            client = self.client_class()
+            if who:
+                client.force_login(getattr(self, who))
+            if session:
+                client_session = client.session
+                client_session.update(session)
+                client_session.save()
+
+            # Each request's writes are undone so scenarios don't interfere.
+            with transaction.atomic():
+                with record_queries() as stats:
+                    response = getattr(client, method.lower())(url, data)
+                transaction.set_rollback(True)
+        return response, stats
+
+    def test_every_url_name_has_a_budget(self):
+        names = {pattern.name for pattern in urlpatterns}
+        self.assertEqual(names - {name for name, _ in QUERY_BUDGETS}, set())
+        self.assertEqual(set(QUERY_BUDGETS) - set(self.scenarios()), set())
+
+    def test_views_stay_within_their_query_budget(self):
+        for key, scenario in self.scenarios().items():
+            with self.subTest(url_name=key[0], method=key[1]):
+                response, stats = self.measure(key, *scenario)
+                self.assertLess(response.status_code, 400)
+                self.assertLessEqual(
+                    stats.count,
+                    QUERY_BUDGETS[key],
+                    f"{key} ran {stats.count} queries; repeated: {stats.duplicates}",
+                )
+
+    def test_booking_submissions_stay_within_their_budget(self):
+        scenarios = self.scenarios()
+        for key in [("book_table", "POST"), ("table_detail", "POST")]:
+            with self.subTest(url_name=key[0]):
+                response, stats = self.measure(key, *scenarios[key])
+                self.assertRedirects(response, reverse("booking_success", args=[response.url.split("/")[-2]]),
+                                     fetch_redirect_response=False)
+                self.assertLessEqual(stats.count, QUERY_BUDGETS[key])
+
+    def test_adding_to_a_new_cart_stays_within_its_budget(self):
+        # bob has no cart yet, so this creates both the cart and the line.
+        response, stats = self.measure(
+            ("add_to_cart", "GET"), "other", (self.foods[4].id,), None, None,
+        )
+        self.assertRedirects(response, reverse("view_cart"), fetch_redirect_response=False)
+        self.assertLessEqual(stats.count, QUERY_BUDGETS["add_to_cart", "GET"])
+
+    def test_order_food_pages_come_from_the_catalog_cache(self):
+        self.client.force_login(self.customer)
+        url = reverse("order_food")
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url, {"after": "garbage"})
+        self.assertFalse([q for q in queries if "menu_fooditem" in q["sql"]])
+
+        food = self.foods[0]
+        food.name = "Renamed dish"
+        food.save()
+        self.assertContains(self.client.get(url), "Renamed dish")
+
+    def test_saving_a_food_re_renders_only_its_card(self):
+        self.client.force_login(self.customer)
+        url = reverse("order_food")
+        self.client.get(url)
+
+        food = self.foods[2]
+        food.price = 99
+        food.save()
+        with mock.patch.object(cache, "set", wraps=cache.set) as cache_set:
+            response = self.client.get(url)
+
+        rendered = [c.args[0] for c in cache_set.call_args_list if "food_card" in c.args[0]]
+        self.assertEqual(len(rendered), 1)
+        self.assertContains(response, "₹99.00")
+
+    def test_admin_tables_only_loads_the_booking_window(self):
+        self.client.force_login(self.staff)
+        tomorrow = timezone.localdate() + datetime.timedelta(days=1)
+        response = self.client.get(reverse("admin_tables"), {"from": tomorrow.isoformat(), "days": 1})
+
+        tables = {table.id: table for table in response.context["tables"]}
+        first, second, _ = self.tables
+        self.assertEqual(tables[first.id].window_count, 1)
+        self.assertEqual(tables[first.id].window_bookings, [self.bookings[0]])
+        self.assertEqual(tables[second.id].window_count, 0)
+        self.assertEqual(tables[second.id].window_bookings, [])
+
+    def test_order_events_answer_short_polls_under_wsgi(self):
+        self.client.force_login(self.customer)
+        response = self.client.get(reverse("my_orders"))
+        self.assertFalse(response.context["order_stream"])
+
+        since = (timezone.now() - datetime.timedelta(hours=1)).isoformat()
+        body = self.client.get(reverse("order_events"), {"since": since}).json()
+        self.assertEqual(len(body["orders"]), len(self.orders))
+
+        # Nothing published since: answered from the cache alone.
+        with record_queries() as stats:
+            again = self.client.get(reverse("order_events"), {"since": body["since"], "version": body["version"]})
+        self.assertEqual(again.json()["orders"], [])
+        self.assertNotIn("menu_order", " ".join(stats.fingerprints))
+
+    def test_order_events_ignore_unusable_cursors(self):
+        self.client.force_login(self.customer)
+        url = reverse("order_events")
+        for since in ["2020-01-01T00:00:00", "2020-02-30T00:00:00", "yesterday", ""]:
+            with self.subTest(since=since):
+                response = self.client.get(url, {"since": since})
+                self.assertEqual(response.status_code, 200)
+                self.assertIn("orders", response.json())
+
+        # A naive cursor is read in the current time zone, so it still finds
+        # the fixture orders.
+        self.assertEqual(len(self.client.get(url, {"since": "2020-01-01T00:00:00"}).json()["orders"]), 4)
+
+    def test_explain_audit_finds_no_unexpected_scans(self):
+        out = io.StringIO()
+        call_command("audit_queries", stdout=out)
+        self.assertIn("admin_tables: 4 queries, 0 full scan(s)", out.getvalue())
+
+    def test_staff_get_stats_header(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse("admin_orders"))
+        self.assertRegex(response["X-SQL-Stats"], r"^queries=\d+; db_ms=[\d.]+; duplicates=\d+; budget=\d+$")
+
+        self.client.force_login(self.customer)
+        response = self.client.get(reverse("my_orders"))
+        self.assertNotIn("X-SQL-Stats", response)
+
+    async def test_async_requests_are_measured(self):
+        await self.async_client.aforce_login(self.staff)
+        response = await self.async_client.get(reverse("admin_orders"))
+        queries = int(response["X-SQL-Stats"].split(";")[0].split("=")[1])
+        self.assertGreater(queries, 0)
+
+    def test_over_budget_requests_are_logged_as_warnings(self):
+        self.client.force_login(self.customer)
+        with mock.patch.dict(QUERY_BUDGETS, {("my_orders", "GET"): 1}):
+            with self.assertLogs("menu.sql", "WARNING") as logs:
+                self.client.get(reverse("my_orders"))
+
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record["url_name"], "my_orders")
+        self.assertEqual(record["budget"], 1)
+        self.assertGreater(record["queries"], 1)
+
+
+@override_settings(**TEST_SETTINGS)
+class SeedAndBenchmarkTests(TestCase):
+    def test_seed_then_benchmark(self):
+        call_command(
+            "seed_data", foods=8, users=6, orders=30, bookings=12, notifications=45,
+            batch_size=7, stdout=open(os.devnull, "w"),
+        )
+        self.assertEqual(Order.objects.filter(user__username__startswith="seed_").count(), 30)
+        # bulk_create inserts in generation order, so ids and numbers agree.
+        numbers = list(Order.objects.order_by("id").values_list("order_number", flat=True))
+        self.assertEqual(len(set(numbers)), len(numbers))
+        self.assertEqual(numbers, sorted(numbers))
+        self.assertEqual(Notification.objects.count(), 45)
+        self.assertEqual(TableBooking.objects.count(), 12)
+        self.assertEqual(OrderStatusCounter.objects.rebuild(commit=False), {})
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bench.json")
+            call_command(
+                "benchmark_views", iterations=2, warmup=1, output=path,
+                stdout=open(os.devnull, "w"),
+            )
+            with open(path) as fh:
+                report = json.load(fh)
+
+        self.assertEqual(report["rows"]["menu.Order"], 30)
+        methods = {name: method.upper() for name, method, _, _ in HOT_VIEWS}
+        for name, row in report["views"].items():
+            with self.subTest(view=name):
+                self.assertLess(row["status"], 400)
+                self.assertLessEqual(row["queries"], QUERY_BUDGETS[name, methods[name]])
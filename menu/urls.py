@@ -83,6 +83,7 @@ urlpatterns = [
 
     # User Orders (VIEW ONLY)
     path('my-orders/', views.my_orders, name='my_orders'),
+    path('my-orders/events/', views.order_events, name='order_events'),
 
     # -------------------- ADMIN DASHBOARD --------------------
     path('admin-dashboard/', views.admin_dashboard, name='admin_dashboard'),
@@ -98,6 +99,7 @@ urlpatterns = [
 
     # -------------------- ADMIN ORDER MANAGEMENT --------------------
     path('admin-orders/', views.admin_orders, name='admin_orders'),
+    path('admin-orders/bulk/', views.bulk_order_transition, name='bulk_order_transition'),
 
     # Order Status Transitions (ADMIN ONLY)
     path('confirm-order/<int:order_id>/', views.confirm_order, name='confirm_order'),
@@ -132,6 +134,58 @@ urlpatterns = [
     path('my-bookings/', views.my_bookings, name='my_bookings'),
     path('cancel-booking/<int:booking_id>/', views.cancel_booking, name='cancel_booking'),
     path('table/<int:table_id>/', views.table_detail, name='table_detail'),
+    path('table/<int:table_id>/slots/', views.table_slots, name='table_slots'),
 
 
 ]
+
+
+# Most SQL queries one request to each view may run, per (URL name, HTTP
+# method), session and user lookups included; HEAD counts as GET. Budgets
+# are for warm caches: the first request after a menu change or a cache
+# miss runs more. menu/tests.py holds every entry to its budget and the
+# instrumentation middleware logs a warning when production exceeds one.
+QUERY_BUDGETS = {
+    ('home', 'GET'): 3,
+    ('register', 'GET'): 0,
+    ('login', 'GET'): 0,
+    ('logout', 'POST'): 4,
+    ('admin_login', 'GET'): 0,
+    ('book_table', 'GET'): 3,
+    ('book_table', 'POST'): 8,
+    ('booking_success', 'GET'): 4,
+    ('order_food', 'GET'): 3,
+    ('add_to_cart', 'GET'): 11,
+    ('view_cart', 'GET'): 3,
+    ('update_cart', 'POST'): 4,
+    ('remove_from_cart', 'POST'): 3,
+    ('checkout', 'GET'): 4,
+    ('process_payment', 'POST'): 13,
+    ('order_success', 'GET'): 4,
+    ('my_orders', 'GET'): 7,
+    ('order_events', 'GET'): 4,
+    ('admin_dashboard', 'GET'): 2,
+    ('add_food_item', 'GET'): 3,
+    ('edit_food_item', 'GET'): 4,
+    ('delete_food_item', 'GET'): 8,
+    ('admin_food_list', 'GET'): 4,
+    ('admin_orders', 'GET'): 5,
+    ('bulk_order_transition', 'POST'): 10,
+    ('confirm_order', 'POST'): 9,
+    ('mark_order_ready', 'POST'): 9,
+    ('complete_order', 'POST'): 9,
+    ('cancel_order', 'POST'): 9,
+    ('notifications', 'GET'): 3,
+    ('mark_notification_read', 'POST'): 4,
+    ('forgot_password', 'GET'): 0,
+    ('set_new_password', 'GET'): 1,
+    ('admin_tables', 'GET'): 4,
+    ('add_table', 'GET'): 2,
+    ('edit_table', 'GET'): 3,
+    ('add_table_review', 'GET'): 3,
+    ('my_bookings', 'GET'): 3,
+    ('cancel_booking', 'POST'): 7,
+    ('table_detail', 'GET'): 4,
+    ('table_detail', 'POST'): 9,
+    ('table_slots', 'GET'): 3,
+}
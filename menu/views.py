@@ -4,9 +4,16 @@ from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
 from django.contrib.auth import authenticate, login, logout
 from django.views.decorators.http import require_POST
+from django.db.models import Count, Prefetch, Q
+from django.db.models.functions import Left
+from django.urls import reverse
+from django.utils.dateparse import parse_datetime
+from django.utils.http import url_has_allowed_host_and_scheme, urlencode
+from django.utils.cache import patch_cache_control
+from django.http import JsonResponse, StreamingHttpResponse
 from django.contrib.auth.models import User
 from .models import Table
-from django.utils.timezone import now
+from django.utils.timezone import is_naive, make_aware, now
 from django.contrib.auth.hashers import make_password
 from datetime import datetime, timedelta
 
@@ -16,20 +23,22 @@ from .models import (
     FoodItem, Category,
     Table, TableBooking, TableReview,
     Cart, CartItem,
-    Order, OrderItem,
+    Order, OrderItem, OrderStatusCounter,
     Notification
 )
 
 from .forms import FoodItemForm
-import random
-import string
+from . import badges, catalog, events, order_flow, orders, search, slots
+from .images import generate_variants
+from .pagination import id_page, keyset_page
 
 
 # ========================= HOME =========================
 
 def home(request):
-    foods = FoodItem.objects.filter(available=True)
-    return render(request, "menu/home.html", {"foods": foods})
+    return render(request, "menu/home.html", {
+        "foods": catalog.get_catalog()["foods"]
+    })
 
 
 # ========================= AUTH =========================
@@ -161,39 +170,23 @@ def book_table(request):
         # 1. Convert to Python objects
         requested_dt = datetime.strptime(f"{date_str} {time_str}", '%Y-%m-%d %H:%M')
         booking_date = requested_dt.date()
-        booking_time = requested_dt.time()
 
         # 2. Prevent booking in the past
         if booking_date < now().date():
             messages.error(request, "❌ You cannot book for a past date.")
             return redirect("book_table")
 
-        # 3. Buffer calculation (29 minutes ensures a 30-minute gap)
-        start_buffer = (requested_dt - timedelta(minutes=29)).time()
-        end_buffer = (requested_dt + timedelta(minutes=29)).time()
-
-        # 4. Conflict Check
-        conflict = TableBooking.objects.filter(
-            table_id=table_id,
-            date=date_str,
-            time__range=(start_buffer, end_buffer)
-        ).exists()
-
-        if conflict:
+        # 3. Book unless another booking is within 30 minutes (across
+        #    midnight too); concurrent requests take turns per table and day.
+        try:
+            booking = slots.reserve(request.user, table_id, requested_dt)
+        except slots.SlotTaken:
             messages.error(
                 request, 
                 "❌ This table is already reserved within 30 minutes of your chosen time."
             )
             return redirect("book_table")
 
-        # 5. Create the booking using the correct variables
-        booking = TableBooking.objects.create(
-            user=request.user,
-            table_id=table_id,
-            date=booking_date,
-            time=booking_time
-        )
-
         messages.success(request, "✅ Booking confirmed!")
         return redirect("booking_success", booking_id=booking.id)
 
@@ -233,39 +226,42 @@ def table_detail(request, table_id):
             messages.error(request, "❌ You cannot book a table for a past date or time.")
             return redirect("table_detail", table_id=table.id)
 
-        # 3. 30-Minute Buffer Check
-        start_range = (requested_dt - timedelta(minutes=29)).time()
-        end_range = (requested_dt + timedelta(minutes=29)).time()
-
-        conflict = TableBooking.objects.filter(
-            table=table,
-            date=date_str,
-            time__range=(start_range, end_range)
-        ).exists()
-
-        if conflict:
+        # 3. Book with the 30-minute buffer check
+        try:
+            new_booking = slots.reserve(request.user, table.id, requested_dt)
+        except slots.SlotTaken:
             messages.error(request, "❌ This table is already booked within 30 minutes of your requested time.")
             return redirect("table_detail", table_id=table.id)
-
-        # 4. Save Booking (Assigned to variable to fix NameError)
-        new_booking = TableBooking.objects.create(
-            user=request.user,
-            table=table,
-            date=requested_dt.date(),
-            time=requested_dt.time()
-        )
         
         messages.success(request, "✅ Table booked successfully!")
         return redirect("booking_success", booking_id=new_booking.id)
 
     return render(request, "menu/table_detail.html", {
         "table": table,
-        "reviews": table.reviews.all()
+        "reviews": table.reviews.select_related("user"),
+        "slot_choices": slots.day_slots(now().date())
+    })
+
+
+@login_required
+def table_slots(request, table_id):
+    table = get_object_or_404(Table, id=table_id, is_active=True)
+    try:
+        day = datetime.strptime(request.GET.get("date", ""), "%Y-%m-%d").date()
+    except ValueError:
+        return JsonResponse({"error": "date must be YYYY-MM-DD"}, status=400)
+
+    response = JsonResponse({
+        "table": table.id,
+        "date": day.isoformat(),
+        "slots": [slot.strftime("%H:%M") for slot in slots.free_slots(table.id, day)],
     })
+    patch_cache_control(response, private=True, max_age=30)
+    return response
 @login_required
 def my_bookings(request):
     # Fetch bookings for the logged-in user
-    bookings = TableBooking.objects.filter(user=request.user).order_by('-date')
+    bookings = TableBooking.objects.filter(user=request.user).select_related('table').order_by('-date')
     return render(request, 'menu/my_bookings.html', {'bookings': bookings})
 
 @login_required
@@ -308,11 +304,64 @@ def add_table_review(request, table_id):
 
 # ========================= FOOD ORDER =========================
 
+MENU_PAGE_SIZE = 24
+FOOD_SUMMARY_LENGTH = 160
+
+
+def _menu_cards():
+    # Cards show two lines of description: load a short prefix, not the
+    # full text.
+    return (
+        FoodItem.objects.filter(available=True)
+        .select_related("category")
+        .defer("description")
+        .annotate(summary=Left("description", FOOD_SUMMARY_LENGTH))
+    )
+
+
 @login_required
 def order_food(request):
+    version = catalog.get_version()
+    categories = catalog.get_catalog(version)["categories"]
+    query = request.GET.get("q", "").strip()
+    active_category = None
+    next_page = None
+
+    if query:
+        foods = search.search_foods(query, _menu_cards())
+    else:
+        foods = _menu_cards()
+        category = request.GET.get("category", "")
+        if category.isdigit():
+            active_category = int(category)
+            foods = foods.filter(category_id=active_category)
+
+        after = request.GET.get("after", "")
+        after = after if after.isdigit() else ""
+        foods, next_cursor = catalog.get_page(
+            f"{active_category or ''}:{after}",
+            lambda: id_page(foods, after, MENU_PAGE_SIZE),
+            version,
+        )
+        if next_cursor:
+            params = {"after": next_cursor}
+            if active_category:
+                params["category"] = active_category
+            next_page = f"{reverse('order_food')}?{urlencode(params)}"
+
+    if request.headers.get("X-Requested-With") == "XMLHttpRequest":
+        # Infinite scroll asks for the next page of cards only.
+        response = render(request, "menu/food_cards.html", {"foods": foods})
+        if next_page:
+            response["X-Next-Page"] = next_page
+        return response
+
     return render(request, "menu/order_food.html", {
-        "foods": FoodItem.objects.filter(available=True),
-        "categories": Category.objects.all()
+        "foods": foods,
+        "categories": categories,
+        "active_category": active_category,
+        "next_page": next_page,
+        "query": query,
     })
 
 
@@ -363,24 +412,69 @@ def delete_food_item(request, food_id):
 # ========================= ADMIN TABLE MANAGEMENT =========================
 
 
+# Selectable booking windows in days; the first is the default.
+ADMIN_BOOKING_RANGES = [7, 1, 30]
+ADMIN_BOOKINGS_PER_TABLE = 5
+
+
 @staff_member_required
 def admin_tables(request):
-    tables = Table.objects.prefetch_related("bookings", "bookings__user")
+    today = now().date()
+    try:
+        start = datetime.strptime(request.GET.get("from", ""), "%Y-%m-%d").date()
+    except ValueError:
+        start = today
+    try:
+        days = int(request.GET.get("days", ""))
+    except ValueError:
+        days = None
+    if days not in ADMIN_BOOKING_RANGES:
+        days = ADMIN_BOOKING_RANGES[0]
+    window = (start, start + timedelta(days=days - 1))
+
+    # Only the window's first few bookings per table are loaded; the
+    # count covers the whole window.
+    bookings = (
+        TableBooking.objects.filter(date__range=window)
+        .select_related("user")
+        .only("table", "date", "time", "user__username")
+        .order_by("date", "time")
+    )
+    tables = list(
+        Table.objects.annotate(
+            window_count=Count("bookings", filter=Q(bookings__date__range=window))
+        ).prefetch_related(
+            Prefetch(
+                "bookings",
+                queryset=bookings[:ADMIN_BOOKINGS_PER_TABLE],
+                to_attr="window_bookings",
+            )
+        )
+    )
+    for table in tables:
+        table.more_bookings = table.window_count - len(table.window_bookings)
+
     return render(request, "menu/admin_tables.html", {
         "tables": tables,
-        "today": now().date()
+        "today": today,
+        "start": start,
+        "end": window[1],
+        "days": days,
+        "ranges": sorted(ADMIN_BOOKING_RANGES),
     })
 
 @staff_member_required(login_url="admin_login")
 def add_table(request):
     if request.method == "POST":
-        Table.objects.create(
+        table = Table.objects.create(
             table_number=request.POST["table_number"],
             seats=request.POST["seats"],
             description=request.POST.get("description", ""),
             image=request.FILES.get("image"),
             is_active=True
         )
+        if table.image:
+            generate_variants(table.image)
         messages.success(request, "✅ Table added successfully")
         return redirect("admin_tables")
 
@@ -401,6 +495,8 @@ def edit_table(request, table_id):
             table.image = request.FILES["image"]
 
         table.save()
+        if request.FILES.get("image"):
+            generate_variants(table.image)
         messages.success(request, "✅ Table updated")
         return redirect("admin_tables")
 
@@ -426,12 +522,14 @@ def add_to_cart(request, food_id):
 
 @login_required
 def view_cart(request):
-    cart = Cart.objects.filter(user=request.user).first()
-    items = cart.cartitem_set.all() if cart else []
+    items = list(
+        CartItem.objects.filter(cart__user=request.user)
+        .select_related("food__category")
+    )
 
     return render(request, "menu/view_cart.html", {
         "cart_items": items,
-        "total": cart.get_total() if cart else 0
+        "total": sum(item.get_subtotal() for item in items)
     })
 
 
@@ -470,7 +568,7 @@ def update_cart(request, cart_item_id):
 @login_required
 def checkout(request):
     cart = get_object_or_404(Cart, user=request.user)
-    items = CartItem.objects.filter(cart=cart)
+    items = list(CartItem.objects.filter(cart=cart).select_related("food"))
     subtotal = sum(i.get_subtotal() for i in items)
 
     return render(request, "menu/checkout.html", {
@@ -481,30 +579,16 @@ def checkout(request):
 
 
 @login_required
+@require_POST
 def process_payment(request):
-    cart = get_object_or_404(Cart, user=request.user)
-    items = CartItem.objects.filter(cart=cart)
-
-    order = Order.objects.create(
-        user=request.user,
-        order_number="ORD" + "".join(random.choices(string.digits, k=8)),
-        total_amount=sum(i.get_subtotal() for i in items),
-        final_amount=sum(i.get_subtotal() for i in items) ,
-        payment_method=request.POST["payment_method"],
-        payment_status="Pending",
-        order_status="Pending"
-    )
+    get_object_or_404(Cart, user=request.user)
 
-    for i in items:
-        OrderItem.objects.create(
-            order=order,
-            food=i.food,
-            quantity=i.quantity,
-            price=i.food.price,
-            subtotal=i.get_subtotal()
-        )
+    try:
+        order = orders.place_order(request.user, request.POST["payment_method"])
+    except orders.EmptyCartError:
+        messages.error(request, "Your cart is empty")
+        return redirect("view_cart")
 
-    items.delete()
     messages.success(request, "Order placed successfully")
     return redirect("order_success", order_id=order.id)
 
@@ -514,106 +598,165 @@ def order_success(request, order_id):
     order = get_object_or_404(Order, id=order_id, user=request.user)
     return render(request, "menu/order_success.html", {
         "order": order,
-        "order_items": OrderItem.objects.filter(order=order)
+        "order_items": OrderItem.objects.filter(order=order).select_related("food")
     })
 
 
 @login_required
 def my_orders(request):
+    # Viewing the list acknowledges every status change shown on it.
+    if Order.objects.filter(user=request.user, seen_by_user=False).update(seen_by_user=True):
+        badges.invalidate(request.user.id)
+
     return render(request, "menu/my_orders.html", {
-        "orders": Order.objects.filter(user=request.user)
+        "orders": Order.objects.filter(user=request.user).prefetch_related(
+            Prefetch(
+                "orderitem_set",
+                queryset=OrderItem.objects.select_related("food")
+            )
+        ),
+        # Under WSGI the page polls order_events instead of streaming it.
+        "order_stream": events.is_streaming(request),
+        "events_since": now().isoformat(),
+        "poll_ms": events.POLL_FALLBACK_MS,
     })
 
 
+def _poll_since(value):
+    """The poll cursor as an aware datetime; now() for anything unusable."""
+    try:
+        since = parse_datetime(value)
+    except ValueError:  # well formed but impossible, e.g. February 30th
+        since = None
+    if since is None:
+        return now()
+    return make_aware(since) if is_naive(since) else since
+
+
+@login_required
+async def order_events(request):
+    user = await request.auser()
+    if not events.is_streaming(request):
+        since = _poll_since(request.GET.get("since", ""))
+        return JsonResponse(
+            await events.order_changes(user.id, since, request.GET.get("version"))
+        )
+
+    response = StreamingHttpResponse(
+        events.order_event_stream(user.id),
+        content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
 # ========================= ADMIN ORDER FLOW =========================
 
 
 
+ADMIN_ORDERS_PAGE_SIZE = 25
+ORDER_STATUSES = [value for value, _ in Order.STATUS_CHOICES]
+
+
 @staff_member_required(login_url="admin_login")
 def admin_orders(request):
-    orders = Order.objects.all().order_by('-created_at') # Added ordering for better UI
+    status = request.GET.get("status")
+    if status not in ORDER_STATUSES:
+        status = None
+
+    orders = Order.objects.select_related("user").prefetch_related(
+        Prefetch(
+            "orderitem_set",
+            queryset=OrderItem.objects.select_related("food")
+        )
+    )
+    if status:
+        orders = orders.filter(order_status=status)
+
+    page, next_cursor = keyset_page(
+        orders, request.GET.get("before"), ADMIN_ORDERS_PAGE_SIZE
+    )
+
+    counts = OrderStatusCounter.objects.as_dict()
     return render(request, "menu/admin_orders.html", {
-        "orders": orders,
-        "all_count": orders.count(),
-        "pending_count": orders.filter(order_status="Pending").count(),
-        "confirmed_count": orders.filter(order_status="Confirmed").count(),
-        "ready_count": orders.filter(order_status="Ready").count(),
-        "completed_count": orders.filter(order_status="Completed").count(),
+        "orders": page,
+        "status": status,
+        "next_cursor": next_cursor,
+        "is_first_page": not request.GET.get("before"),
+        "all_count": sum(counts.values()),
+        "pending_count": counts["Pending"],
+        "confirmed_count": counts["Confirmed"],
+        "ready_count": counts["Ready"],
+        "completed_count": counts["Completed"],
     })
 
+
+def _back_to_orders(request):
+    # Return staff to the filtered/paged board they acted from.
+    next_url = request.POST.get("next")
+    if next_url and url_has_allowed_host_and_scheme(
+        next_url, allowed_hosts={request.get_host()}
+    ):
+        return redirect(next_url)
+    return redirect("admin_orders")
+
 @staff_member_required(login_url="admin_login")
 @require_POST
-def confirm_order(request, order_id):
-    order = get_object_or_404(Order, id=order_id)
-    order.order_status = "Confirmed"
-    est_time = request.POST.get("estimated_time", "20 minutes")
-    order.estimated_time = est_time
-    order.seen_by_user = False
-    order.save()
-
-    # CREATE NOTIFICATION
-    Notification.objects.create(
-        user=order.user,
-        notification_type='order',
-        title="Order Confirmed! ✅",
-        message=f"Your order #{order.id} has been confirmed. Estimated time: {est_time}.",
-        order=order
+def bulk_order_transition(request):
+    action = request.POST.get("action")
+    if action not in order_flow.TRANSITIONS:
+        messages.error(request, "Unknown order action")
+        return _back_to_orders(request)
+
+    order_ids = [int(i) for i in request.POST.getlist("order_ids") if i.isdigit()]
+    moved = order_flow.bulk_transition(
+        action,
+        order_ids,
+        estimated_time=request.POST.get("estimated_time")
     )
-    return redirect("admin_orders")
+
+    skipped = len(order_ids) - len(moved)
+    messages.success(request, f"{len(moved)} order(s) updated")
+    if skipped:
+        messages.warning(request, f"{skipped} order(s) skipped: not in a state that allows this")
+    return _back_to_orders(request)
+
+def _order_transition(request, order_id, action):
+    won = order_flow.transition(
+        order_id,
+        action,
+        expected=request.POST.get("expected") or None,
+        estimated_time=request.POST.get("estimated_time")
+    )
+    if not won:
+        get_object_or_404(Order.objects.only("id"), id=order_id)
+        messages.warning(request, "Order was already updated by someone else. Please check its current status.")
+    return _back_to_orders(request)
+
+
+@staff_member_required(login_url="admin_login")
+@require_POST
+def confirm_order(request, order_id):
+    return _order_transition(request, order_id, "confirm")
+
 
 @staff_member_required(login_url="admin_login")
 @require_POST
 def mark_order_ready(request, order_id):
-    order = get_object_or_404(Order, id=order_id)
-    order.order_status = "Ready"
-    order.seen_by_user = False
-    order.save()
-
-    # CREATE NOTIFICATION
-    Notification.objects.create(
-        user=order.user,
-        notification_type='order',
-        title="Order Ready! 🍕",
-        message=f"Great news! Your order #{order.id} is ready for pickup or delivery.",
-        order=order
-    )
-    return redirect("admin_orders")
+    return _order_transition(request, order_id, "ready")
+
 
 @staff_member_required(login_url="admin_login")
 @require_POST
 def complete_order(request, order_id):
-    order = get_object_or_404(Order, id=order_id)
-    order.order_status = "Completed"
-    order.seen_by_user = False
-    order.save()
-
-    # CREATE NOTIFICATION
-    Notification.objects.create(
-        user=order.user,
-        notification_type='order',
-        title="Order Completed! ✨",
-        message=f"Order #{order.id} has been marked as completed. Hope you enjoy your meal!",
-        order=order
-    )
-    return redirect("admin_orders")
+    return _order_transition(request, order_id, "complete")
+
 
 @staff_member_required(login_url="admin_login")
 @require_POST
 def cancel_order(request, order_id):
-    order = get_object_or_404(Order, id=order_id)
-    order.order_status = "Cancelled"
-    order.seen_by_user = False
-    order.save()
-
-    # CREATE NOTIFICATION
-    Notification.objects.create(
-        user=order.user,
-        notification_type='order',
-        title="Order Cancelled ❌",
-        message=f"We regret to inform you that your order #{order.id} has been cancelled.",
-        order=order
-    )
-    return redirect("admin_orders")
+    return _order_transition(request, order_id, "cancel")
 
 
 # ========================= NOTIFICATIONS =========================
@@ -623,7 +766,7 @@ def notifications(request):
     notifs = Notification.objects.filter(user=request.user)
     return render(request, "menu/notifications.html", {
         "notifications": notifs,
-        "unread_count": notifs.filter(is_read=False).count()
+        "unread_count": badges.get_unread_counts(request.user.id)["notifications"]
     })
 
 
@@ -636,5 +779,5 @@ def mark_notification_read(request, notification_id):
         user=request.user
     )
     notif.is_read = True
-    notif.save()
+    notif.save(update_fields=["is_read"])
     return redirect("notifications")